@@ -1,6 +1,7 @@
 """DriftBalloon Python SDK - LLM output drift detection and observability."""
 
+from driftballoon.async_client import AsyncDriftBalloon, AsyncLogTask
 from driftballoon.client import DriftBalloon, LogTask
 
 __version__ = "0.2.1"
-__all__ = ["DriftBalloon", "LogTask"]
+__all__ = ["AsyncDriftBalloon", "AsyncLogTask", "DriftBalloon", "LogTask"]
@@ -0,0 +1,144 @@
+"""JSON encoding and decoding for SDK requests and responses."""
+
+from __future__ import annotations
+
+import gzip
+import json
+
+# Bodies smaller than this are sent as plain JSON; gzip framing overhead
+# outweighs the savings on tiny payloads.
+GZIP_MIN_BYTES = 1024
+
+# Shared, never mutated: httpx copies request headers into each request.
+JSON_HEADERS = {"Content-Type": "application/json"}
+GZIP_JSON_HEADERS = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+
+def _stdlib_dumps(obj: object) -> bytes:
+    """Serialize to compact UTF-8 JSON with the standard library."""
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        allow_nan=False,
+    ).encode("utf-8")
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on installed extras
+    msgspec = None
+
+# Optional C extensions, best first. msgspec (``pip install
+# driftballoon[speedups]``) is the fastest on log batches and config
+# payloads. orjson is not part of the extra, but is nearly as fast and is
+# used when it is already installed without msgspec. All return the same
+# bytes/objects.
+if msgspec is not None:
+    dumps = msgspec.json.Encoder().encode
+    loads = msgspec.json.Decoder().decode
+elif orjson is not None:  # pragma: no cover - depends on installed extras
+    dumps = orjson.dumps
+    loads = orjson.loads
+else:  # pragma: no cover - depends on installed extras
+    dumps = _stdlib_dumps
+    loads = json.loads
+
+
+# Config responses at least this large (or of unknown length) are parsed
+# incrementally when ijson is installed, instead of buffered whole.
+STREAM_MIN_BYTES = 256 * 1024
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - depends on installed extras
+    ijson = None
+
+
+def should_stream(content_length: str | None) -> bool:
+    """Return whether a config body of ``content_length`` should be stream-parsed."""
+    if ijson is None:
+        return False
+    return content_length is None or int(content_length) >= STREAM_MIN_BYTES
+
+
+class ConfigStreamParser:
+    """Incremental parser yielding ``(name, config)`` pairs from a config body.
+
+    Feed decoded body chunks as they arrive; each call returns the prompts that
+    became complete, so peak memory stays at roughly one prompt rather than
+    the entire response. Requires the optional ``ijson`` package.
+    """
+
+    def __init__(self):
+        self._items = ijson.sendable_list()
+        self._coro = ijson.kvitems_coro(self._items, "prompts", use_float=True)
+
+    def feed(self, chunk: bytes) -> list[tuple[str, dict]]:
+        """Parse a body chunk and return the prompts it completed."""
+        self._coro.send(chunk)
+        return self._drain()
+
+    def close(self) -> list[tuple[str, dict]]:
+        """Finish parsing and return any remaining prompts."""
+        self._coro.close()
+        return self._drain()
+
+    def _drain(self) -> list[tuple[str, dict]]:
+        items = list(self._items)
+        del self._items[:]
+        return items
+
+
+def encode_logs(logs: list[dict], compress: bool = False) -> tuple[bytes, dict[str, str]]:
+    """
+    Encode a ``{"logs": [...]}`` request body.
+
+    LLM prompts and responses are highly compressible natural language, so
+    large bodies are gzipped at level 1, which keeps CPU cost minimal.
+
+    Args:
+        logs: Log entries to send
+        compress: Gzip bodies of at least GZIP_MIN_BYTES (default False)
+
+    Returns:
+        Tuple of (body, headers) to pass as ``content=`` and ``headers=``
+    """
+    return _finish_body(dumps({"logs": logs}), compress)
+
+
+def encode_log_batch(entries: list[bytes], compress: bool = False) -> tuple[bytes, dict[str, str]]:
+    """
+    Encode a ``{"logs": [...]}`` request body from already-serialized entries.
+
+    Lets queued logs be serialized once and reused verbatim on every retry.
+
+    Args:
+        entries: JSON-encoded log entries, as returned by dumps()
+        compress: Gzip bodies of at least GZIP_MIN_BYTES (default False)
+
+    Returns:
+        Tuple of (body, headers) to pass as ``content=`` and ``headers=``
+    """
+    if not entries:
+        return _finish_body(b'{"logs":[]}', compress)
+
+    # Interleave entries with separators and join once, so the body is the
+    # only buffer built; concatenating prefix and suffix would copy it twice more.
+    parts = [b","] * (2 * len(entries) + 1)
+    parts[1::2] = entries
+    parts[0] = b'{"logs":['
+    parts[-1] = b"]}"
+    return _finish_body(b"".join(parts), compress)
+
+
+def _finish_body(body: bytes, compress: bool) -> tuple[bytes, dict[str, str]]:
+    if compress and len(body) >= GZIP_MIN_BYTES:
+        return gzip.compress(body, compresslevel=1), GZIP_JSON_HEADERS
+
+    return body, JSON_HEADERS
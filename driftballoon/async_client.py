@@ -0,0 +1,620 @@
+"""Asyncio-native DriftBalloon SDK client."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from collections import deque
+
+import httpx
+
+from driftballoon._encoding import (
+    ConfigStreamParser,
+    encode_log_batch,
+    encode_logs,
+    loads,
+    should_stream,
+)
+from driftballoon.client import (
+    _NS_FOREVER,
+    _NS_NEVER,
+    _NS_PER_S,
+    DriftBalloon,
+    PromptConfig,
+    QueuedLog,
+    _encoded,
+    _http_client_options,
+    _log_data,
+    _merge_prompt_configs,
+    _overflow,
+    _push_retries,
+    _schedule_retry,
+    _take_due,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLogTask:
+    """A pending log operation. Await .invoke() or call .submit() to execute."""
+
+    __slots__ = ("_client", "_data")
+
+    def __init__(self, client: AsyncDriftBalloon, data: dict):
+        self._client = client
+        self._data = data
+
+    async def invoke(self) -> None:
+        """Send the log and wait until the server responds."""
+        await self._client._send_log(self._data)
+
+    def submit(self) -> None:
+        """Queue the log for background submission (fire-and-forget)."""
+        self._client._enqueue([QueuedLog(data=self._data)])
+
+
+class AsyncDriftBalloon:
+    """
+    Asyncio-native DriftBalloon SDK client.
+
+    Mirrors DriftBalloon, but runs config sync and log submission as a task
+    on the running event loop instead of a background thread, so it never
+    blocks async web handlers.
+
+    Usage:
+        async with AsyncDriftBalloon(api_key="db_sk_xxxx") as db:
+            # After each LLM call — fire-and-forget
+            db.log(name="summarizer", response=response, prompt=prompt, model=model).submit()
+
+            # Or wait until the server confirms receipt
+            await db.log(name="summarizer", response=response, prompt=prompt, model=model).invoke()
+
+            active = db.get_active_prompt("summarizer")
+    """
+
+    DEFAULT_BASE_URL = DriftBalloon.DEFAULT_BASE_URL
+    FLUSH_THRESHOLD = DriftBalloon.FLUSH_THRESHOLD
+    MAX_BATCH_SIZE = DriftBalloon.MAX_BATCH_SIZE
+    BATCH_POST_SIZE = DriftBalloon.BATCH_POST_SIZE
+    MAX_CONCURRENT_FLUSHES = DriftBalloon.MAX_CONCURRENT_FLUSHES
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        sync_interval: float = 30.0,
+        auto_start: bool = True,
+        max_queue_size: int = 10_000,
+        compress_logs: bool = False,
+        config_max_age: float | None = None,
+    ):
+        """
+        Initialize AsyncDriftBalloon client.
+
+        Args:
+            api_key: Your DriftBalloon API key (starts with db_sk_)
+            base_url: API base URL (defaults to https://server.driftballoon.com)
+            sync_interval: Config sync interval in seconds (default 30)
+            auto_start: Start background sync automatically (default True).
+                When no event loop is running yet, sync starts on ``async with``,
+                an explicit ``start()``, or the first submit made on a running loop.
+            max_queue_size: Maximum number of queued logs kept while the server
+                is unreachable, and separately of failed logs awaiting a
+                retry; the oldest queued entries are dropped first (default 10000)
+            compress_logs: Gzip log request bodies of 1 KB or more; enable only if
+                the server accepts gzip request bodies (default False)
+            config_max_age: If set, a config read wakes the background task
+                to sync when no sync has been attempted for this many seconds
+                (default None: never). Reads never wait for the sync.
+        """
+        if not api_key or not api_key.startswith("db_sk_"):
+            raise ValueError("Invalid API key format. Must start with 'db_sk_'")
+
+        self.api_key = api_key
+        self.base_url = (base_url or self.DEFAULT_BASE_URL).rstrip("/")
+        self._logs_url = f"{self.base_url}/api/v1/logs"
+        self._config_url = f"{self.base_url}/api/v1/config"
+        self._sync_interval = sync_interval
+        self._sync_interval_ns = int(sync_interval * _NS_PER_S)
+        self._compress_logs = compress_logs
+        self._config_max_age_ns = None if config_max_age is None else int(config_max_age * _NS_PER_S)
+        self._auto_start = auto_start
+
+        # Local config cache and log queue. Every access happens on the event
+        # loop thread and never spans an await, so no locks are needed.
+        self._config_cache: dict[str, PromptConfig] = {}
+        # Bumped each time a sync publishes new config
+        self._config_version = 0
+        # ETag of the last config body applied; sent as If-None-Match
+        self._config_etag: str | None = None
+        # time.monotonic_ns() of the last sync attempt, successful or not
+        self._config_checked_at = _NS_NEVER
+        # Memoized get_active_prompt() results; reset on every config sync
+        self._active_prompt_cache: dict[str, str | None] = {}
+        self._log_queue: deque[QueuedLog] = deque(maxlen=max_queue_size)
+        # Failed logs waiting out their backoff, as a heap of (next_attempt_at, seq, log)
+        self._retry_queue: list[tuple[int, int, QueuedLog]] = []
+        self._retry_seq = itertools.count()
+        # Logs dropped because the queue was full
+        self._overflow_count = 0
+        # Caps concurrent _flush_logs() calls; created on the running loop
+        self._flush_slots: asyncio.Semaphore | None = None
+        # Flushes holding logs outside the queue while their POSTs are awaited
+        self._flushes_in_flight = 0
+        # Callers awaiting wait_drained()
+        self._drain_waiters = 0
+
+        # Background sync
+        self._running = False
+        self._sync_task: asyncio.Task | None = None
+        # Created on the running loop (in start() and wait_drained())
+        self._wake: asyncio.Event | None = None
+        self._drained: asyncio.Event | None = None
+        # time.monotonic_ns() the next config sync is due; 0 syncs on the first cycle
+        self._next_sync_at = 0
+        # time.monotonic_ns() the earliest retry comes out of backoff
+        self._next_retry_at: int | None = None
+        # After a failed cycle, time.monotonic_ns() before which fresh logs
+        # neither wake the worker nor get sent; 0 when the server is healthy
+        self._backoff_until = 0
+
+        # HTTP client
+        self._http_client: httpx.AsyncClient | None = None
+
+        # auto_start was requested before any event loop was running; the
+        # first submit made on a running loop starts the task instead
+        self._start_pending = False
+        self._warned_no_loop = False
+
+        if auto_start:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                self._start_pending = True
+            else:
+                self.start()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Get or create HTTP client."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(**_http_client_options(self.api_key, self._sync_interval))
+        return self._http_client
+
+    @property
+    def config_version(self) -> int:
+        """Number of config syncs published so far; changes whenever the cache does."""
+        return self._config_version
+
+    @property
+    def queue_overflow_count(self) -> int:
+        """Number of logs dropped so far because the queue hit max_queue_size."""
+        return self._overflow_count
+
+    def start(self):
+        """Start the background sync task on the running event loop."""
+        if self._running:
+            return
+
+        self._start_pending = False
+        self._running = True
+        self._wake = asyncio.Event()
+        self._sync_task = asyncio.create_task(self._background_worker())
+        logger.debug("DriftBalloon background sync started")
+
+    async def stop(self):
+        """Stop background sync and flush remaining logs."""
+        self._start_pending = False
+        if self._running or self._log_queue or self._retry_queue:
+            self._running = False
+            if self._sync_task:
+                # Let the task finish its cycle instead of cancelling it mid-POST
+                self._wake.set()
+                _, pending = await asyncio.wait({self._sync_task}, timeout=5.0)
+                if pending:
+                    self._sync_task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await self._sync_task
+                self._sync_task = None
+            await self._flush_logs(ignore_backoff=True)
+
+        # Release the pool even on a never-started client that used invoke()
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def log(
+        self,
+        name: str,
+        response: str,
+        prompt: str,
+        model: str,
+    ) -> AsyncLogTask:
+        """
+        Log an LLM response for drift detection.
+
+        Returns an AsyncLogTask — call .submit() for fire-and-forget or
+        await .invoke() to wait until the server confirms receipt.
+
+        Prompt names, model names and short prompts are interned, so use
+        stable names rather than per-request unique ones.
+
+        Args:
+            name: Name of the prompt
+            response: The LLM response text
+            prompt: The input prompt sent to the LLM
+            model: The LLM model used
+
+        Returns:
+            AsyncLogTask with .invoke() and .submit() methods
+        """
+        data = _log_data(name, response, prompt, model)
+        return AsyncLogTask(self, data)
+
+    def log_submit(
+        self,
+        name: str,
+        response: str,
+        prompt: str,
+        model: str,
+    ) -> None:
+        """
+        Queue an LLM response for background submission (fire-and-forget).
+
+        Same as ``log(...).submit()`` without building the intermediate
+        AsyncLogTask, for hot call sites.
+
+        Args:
+            name: Name of the prompt
+            response: The LLM response text
+            prompt: The input prompt sent to the LLM
+            model: The LLM model used
+        """
+        self._enqueue([QueuedLog(data=_log_data(name, response, prompt, model))])
+
+    def log_many(self, entries: list[dict]) -> None:
+        """
+        Queue several LLM responses for background submission at once.
+
+        Equivalent to calling ``log(**entry).submit()`` for each entry.
+
+        Args:
+            entries: Dicts with the same keys as log() arguments
+                (name, response, prompt, model)
+        """
+        self._enqueue([QueuedLog(data=_log_data(**entry)) for entry in entries])
+
+    def get_active_prompt(self, name: str) -> str | None:
+        """
+        Get the currently active prompt version.
+
+        Args:
+            name: Name of the prompt
+
+        Returns:
+            "a" or "b", or None if not found
+        """
+        if self._config_max_age_ns is not None:
+            self._refresh_if_stale()
+
+        # A sync swaps in the new cache and an empty memo with no await in
+        # between, so a memo entry always comes from the current cache.
+        memo = self._active_prompt_cache
+        try:
+            return memo[name]
+        except KeyError:
+            pass
+
+        config = self._config_cache.get(name)
+        active = config.active_prompt if config else None
+        memo[name] = active
+        return active
+
+    def get_config(self, name: str) -> PromptConfig | None:
+        """
+        Get the full configuration for a prompt.
+
+        Args:
+            name: Name of the prompt
+
+        Returns:
+            PromptConfig or None if not found
+        """
+        if self._config_max_age_ns is not None:
+            self._refresh_if_stale()
+        return self._config_cache.get(name)
+
+    def get_baseline_status(self, name: str) -> tuple[str, int]:
+        """
+        Get the baseline learning status for a prompt.
+
+        Args:
+            name: Name of the prompt
+
+        Returns:
+            Tuple of (status: "learning"|"ready", sample_count)
+        """
+        if self._config_max_age_ns is not None:
+            self._refresh_if_stale()
+        config = self._config_cache.get(name)
+        if not config:
+            return ("learning", 0)
+
+        return (config.baseline_status, config.baseline_sample_count)
+
+    async def sync_and_get(self, name: str) -> tuple[PromptConfig | None, tuple[str, int]]:
+        """
+        Sync config from the server now, then read one prompt from the fresh cache.
+
+        One config request instead of waiting for the next background sync;
+        useful right after a prompt is first logged.
+
+        Args:
+            name: Name of the prompt
+
+        Returns:
+            Tuple of (get_config(name), get_baseline_status(name))
+        """
+        await self._sync_config()
+        return (self.get_config(name), self.get_baseline_status(name))
+
+    async def wait_drained(self, timeout: float | None = None) -> bool:
+        """
+        Wake the background task and wait until every queued log is sent.
+
+        Logs that exhaust their retries count as sent. Only meaningful on a
+        started client, since nothing else drains the queue.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if the queue drained, False if the timeout expired first
+        """
+        if self._drained is None:
+            self._drained = asyncio.Event()
+        # While a waiter is registered the task keeps flushing past a short
+        # remainder instead of sleeping until the next sync
+        self._drain_waiters += 1
+        try:
+            if self._wake is not None:
+                self._wake.set()
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._log_queue or self._retry_queue or self._flushes_in_flight:
+                self._drained.clear()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                try:
+                    await asyncio.wait_for(self._drained.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return False
+            return True
+        finally:
+            self._drain_waiters -= 1
+
+    def _refresh_if_stale(self) -> None:
+        """Wake the background task if no sync was attempted within config_max_age."""
+        now = time.monotonic_ns()
+        if self._wake is None or now - self._config_checked_at < self._config_max_age_ns:
+            return
+        # Count the wake as an attempt so a burst of stale reads wakes once
+        self._config_checked_at = now
+        self._next_sync_at = 0
+        self._wake.set()
+
+    def _enqueue(self, entries: list[QueuedLog]) -> None:
+        """Append entries to the log queue."""
+        self._overflow_count += _overflow(self._log_queue, len(entries))
+        self._log_queue.extend(entries)
+        if self._start_pending:
+            self._start_deferred()
+
+        # Wake the worker as soon as a full batch is waiting; retries in
+        # backoff live apart, so everything counted here is due now. While
+        # the server is failing, the next retry decides when to try again.
+        if (
+            self._wake is not None
+            and len(self._log_queue) >= self.FLUSH_THRESHOLD
+            and time.monotonic_ns() >= self._backoff_until
+        ):
+            self._wake.set()
+
+    def _start_deferred(self) -> None:
+        """Start the task deferred by auto_start, if a loop is running now."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if not self._warned_no_loop:
+                self._warned_no_loop = True
+                logger.warning(
+                    "AsyncDriftBalloon has no running event loop; queued logs are only "
+                    "sent once the client is started from async code"
+                )
+            return
+        self.start()
+
+    async def _send_log(self, data: dict) -> None:
+        """Send a single log entry and wait for the response."""
+        content, headers = encode_logs([data], compress=self._compress_logs)
+        await self.http_client.post(
+            self._logs_url,
+            content=content,
+            headers=headers,
+        )
+
+    async def _background_worker(self):
+        """Background task for config sync and log submission.
+
+        The first cycle runs immediately, so its config GET also opens the
+        pooled connection before the first log is sent.
+
+        Config syncs keep to sync_interval; logs are flushed on every wake,
+        and again straight away while a backlog remains. Otherwise the task
+        sleeps until the next sync or the earliest retry leaving backoff.
+        """
+        while self._running:
+            sent = 0
+            try:
+                now = time.monotonic_ns()
+                if now >= self._next_sync_at:
+                    self._next_sync_at = now + self._sync_interval_ns
+                    # Both calls are independent round trips; overlap them
+                    _, sent = await asyncio.gather(self._sync_config(), self._flush_logs())
+                else:
+                    sent = await self._flush_logs()
+            except Exception as e:
+                logger.error(f"Background worker error: {e}")
+
+            # A full cycle was accepted and another batch is already waiting,
+            # or any remainder while wait_drained() is pending; after any
+            # failure, wait for the next wake instead of retrying at once
+            backlog = len(self._log_queue)
+            if sent >= self.MAX_BATCH_SIZE and (
+                backlog >= self.FLUSH_THRESHOLD or (backlog and self._drain_waiters)
+            ):
+                # Still yield, so a steady stream of submits cannot starve the loop
+                await asyncio.sleep(0)
+                continue
+
+            wake_at = self._next_sync_at
+            if self._next_retry_at is not None:
+                wake_at = min(wake_at, self._next_retry_at)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0, wake_at - time.monotonic_ns()) / _NS_PER_S)
+            self._wake.clear()
+
+    async def _sync_config(self):
+        """Fetch latest config from server and populate cache for all prompts."""
+        self._config_checked_at = time.monotonic_ns()
+        try:
+            headers = {"If-None-Match": self._config_etag} if self._config_etag else None
+            async with self.http_client.stream("GET", self._config_url, headers=headers) as response:
+                if response.status_code == 304:
+                    logger.debug("Config unchanged on server")
+                    return
+                if response.status_code != 200:
+                    return
+
+                # Merge into a copy and publish it once the whole body is in,
+                # so reads between chunks never see a half-applied sync
+                cache = dict(self._config_cache)
+                if should_stream(response.headers.get("content-length")):
+                    # Prompts are parsed as they arrive, while the tail of
+                    # the body is still in flight
+                    parser = ConfigStreamParser()
+                    async for chunk in response.aiter_bytes():
+                        _merge_prompt_configs(cache, parser.feed(chunk))
+                    _merge_prompt_configs(cache, parser.close())
+                else:
+                    data = loads(await response.aread())
+                    _merge_prompt_configs(cache, data.get("prompts", {}).items())
+                self._config_cache = cache
+                self._active_prompt_cache = {}
+                self._config_version += 1
+                self._config_etag = response.headers.get("etag")
+
+            logger.debug("Config synced from server")
+
+        except Exception as e:
+            logger.debug(f"Config sync failed (using cached): {e}")
+
+    async def _flush_logs(self, ignore_backoff: bool = False):
+        """Send queued logs to server, posting all batches concurrently.
+
+        Args:
+            ignore_backoff: Also send logs still waiting out a retry delay
+                (used for the final flush on stop)
+
+        Returns:
+            Number of logs the server accepted this cycle; 0 when skipped
+            because MAX_CONCURRENT_FLUSHES are already running
+        """
+        if self._flush_slots is None:
+            self._flush_slots = asyncio.Semaphore(self.MAX_CONCURRENT_FLUSHES)
+        # A periodic flush that finds every slot busy is skipped rather than
+        # piling up behind the others; the final flush on stop() waits.
+        if self._flush_slots.locked() and not ignore_backoff:
+            return 0
+        await self._flush_slots.acquire()
+
+        now = _NS_FOREVER if ignore_backoff else time.monotonic_ns()
+        to_process = _take_due(self._retry_queue, self._log_queue, self.MAX_BATCH_SIZE, now, self._backoff_until)
+        self._flushes_in_flight += 1
+        retries: list[QueuedLog] = []
+
+        try:
+            if to_process:
+                batches = [
+                    to_process[i:i + self.BATCH_POST_SIZE]
+                    for i in range(0, len(to_process), self.BATCH_POST_SIZE)
+                ]
+                results = await asyncio.gather(*[self._post_batch(batch) for batch in batches])
+                retries = [item for _, failed in results for item in failed]
+                return sum(accepted for accepted, _ in results)
+            return 0
+        except asyncio.CancelledError:
+            # Whether the cancelled POSTs arrived is unknown; keep the logs
+            retries = to_process
+            raise
+        finally:
+            # Retries beyond max_queue_size are dropped, which still counts as overflow
+            self._overflow_count += _push_retries(
+                self._retry_queue, retries, self._retry_seq, self._log_queue.maxlen
+            )
+            self._next_retry_at = self._retry_queue[0][0] if self._retry_queue else None
+            if to_process:
+                # A failed cycle holds back fresh logs until the next retry
+                # probes the server again; a cycle that fully succeeds lifts it
+                self._backoff_until = self._next_retry_at if retries else 0
+            self._flushes_in_flight -= 1
+            self._flush_slots.release()
+            if (
+                self._drained is not None
+                and not self._log_queue
+                and not self._retry_queue
+                and not self._flushes_in_flight
+            ):
+                self._drained.set()
+
+    async def _post_batch(self, batch: list[QueuedLog]) -> tuple[int, list[QueuedLog]]:
+        """POST one batch of logs.
+
+        Returns:
+            Tuple of (number of logs the server accepted, entries to retry)
+        """
+        parts, batch = _encoded(batch)
+        if not batch:
+            return 0, []
+        try:
+            content, headers = encode_log_batch(parts, compress=self._compress_logs)
+            response = await self.http_client.post(
+                self._logs_url,
+                content=content,
+                headers=headers,
+            )
+
+            if response.status_code == 429:
+                # Rate limited - back off without spending a retry
+                return 0, _schedule_retry(batch, count_attempt=False)
+            if response.status_code in (200, 201, 202):
+                return len(batch), []
+
+        except Exception as e:
+            logger.debug(f"Log submission failed: {e}")
+
+        # Error - retry with backoff
+        return 0, _schedule_retry(batch)
+
+    async def __aenter__(self):
+        """Async context manager entry - start background sync if enabled."""
+        if self._auto_start:
+            self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - stop background sync."""
+        await self.stop()
+        return False
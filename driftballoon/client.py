@@ -3,25 +3,85 @@
 from __future__ import annotations
 
 import atexit
+import contextlib
+import heapq
+import itertools
+import logging
+import random
+import sys
 import threading
 import time
-import logging
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 
 import httpx
 
+from driftballoon._encoding import (
+    ConfigStreamParser,
+    dumps,
+    encode_log_batch,
+    encode_logs,
+    loads,
+    should_stream,
+)
+
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - depends on installed extras
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
 
-@dataclass
+def _http_client_options(api_key: str, sync_interval: float) -> dict:
+    """Shared httpx client settings: one long-lived pool per SDK client.
+
+    HTTP/2 (``pip install driftballoon[http2]``) multiplexes concurrent log
+    batches and config syncs over a single connection; without ``h2`` the
+    pool falls back to keep-alive HTTP/1.1 connections. Idle connections
+    outlive two sync intervals, so a quiet client still reuses its
+    connection on the next cycle instead of paying a new TLS handshake.
+    """
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "timeout": httpx.Timeout(10.0, connect=3.0),
+        "headers": {"X-API-Key": api_key},
+        "limits": httpx.Limits(
+            max_keepalive_connections=8,
+            max_connections=16,
+            keepalive_expiry=max(60.0, 2 * sync_interval),
+        ),
+    }
+
+
+MAX_RETRY_DELAY = 60.0  # Seconds; cap for exponential retry backoff
+# Internal deadlines are integer time.monotonic_ns() values
+_NS_PER_S = 1_000_000_000
+# Stand-ins for minus and plus infinity that keep those values ints
+_NS_NEVER = -(1 << 62)
+_NS_FOREVER = 1 << 62
+_INTERN_MAX_PROMPT_LEN = 4096  # Longer prompts are not interned
+
+# Slotted dataclasses drop the per-instance __dict__ (one QueuedLog is made
+# per logged call); slots=True requires Python 3.10+.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class QueuedLog:
     """A log entry queued for submission."""
     data: dict
     retry_count: int = 0
     max_retries: int = 5
+    next_attempt_at: int = 0  # time.monotonic_ns() before which it is not retried
+    encoded: bytes | None = None  # Serialized data, kept so retries skip re-encoding
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PromptConfig:
     """Configuration for a prompt."""
     name: str
@@ -35,9 +95,169 @@ class PromptConfig:
     status: str = "active"
 
 
+# Server-synced PromptConfig fields, in declaration order
+_FIELDS = tuple(f.name for f in fields(PromptConfig) if f.name != "name")
+# Supplies the defaults when a prompt is first seen
+_DEFAULT_CONFIG = PromptConfig(name="")
+
+
+def _compile_merger(field_names: tuple[str, ...]):
+    """Generate an unrolled ``merge(name, base, data)`` function for ``field_names``.
+
+    ``merge`` returns a new PromptConfig in a single constructor call: each
+    of ``field_names`` comes from ``data`` unless absent or null, and every
+    other field is copied from ``base``. The server sends every field for
+    every prompt on each sync, so a per-field loop with getattr dispatch
+    dominates large config merges; the generated code leaves only a dict
+    lookup and an attribute read per field.
+    """
+    args = []
+    for f in fields(PromptConfig):
+        if f.name == "name":
+            continue
+        if f.name in field_names:
+            args.append(f"        {f.name}=v if (v := get({f.name!r})) is not None else base.{f.name},")
+        else:
+            args.append(f"        {f.name}=base.{f.name},")
+    lines = ["def merge(name, base, data):", "    get = data.get", "    return PromptConfig(", "        name=name,"]
+    lines += args
+    lines += ["    )"]
+    namespace: dict = {"PromptConfig": PromptConfig}
+    exec("\n".join(lines), namespace)  # noqa: S102 - built from dataclass field names
+    return namespace["merge"]
+
+
+_merge_prompt_config = _compile_merger(_FIELDS)
+
+
+def _merge_prompt_configs(cache: dict[str, PromptConfig], prompts: Iterable[tuple[str, dict]]) -> None:
+    """Merge ``(name, config)`` pairs from a server payload into a config cache in place.
+
+    Updated prompts are stored as new PromptConfig objects, so ones already
+    handed out by a previous cache stay unchanged.
+    """
+    get = cache.get
+    for name, config_data in prompts:
+        # Absent or null fields keep the cached value, or the default for a new prompt
+        cache[name] = _merge_prompt_config(name, get(name, _DEFAULT_CONFIG), config_data)
+
+
+def _overflow(queue: deque, incoming: int) -> int:
+    """Number of entries a bounded deque drops when ``incoming`` more are added."""
+    return max(0, len(queue) + incoming - queue.maxlen)
+
+
+def _take_due(
+    retries: list[tuple[int, int, QueuedLog]],
+    queue: deque[QueuedLog],
+    limit: int,
+    now: int,
+    fresh_after: int = 0,
+) -> list[QueuedLog]:
+    """Pop up to ``limit`` logs to send: retries whose backoff has elapsed, then fresh logs.
+
+    Retries still backing off stay in their heap untouched, so a cycle only
+    costs as much as the logs it actually sends. Fresh logs are held back
+    until ``fresh_after``, while the client as a whole is backing off.
+    """
+    due: list[QueuedLog] = []
+    while retries and retries[0][0] <= now and len(due) < limit:
+        due.append(heapq.heappop(retries)[-1])
+    if now >= fresh_after:
+        while queue and len(due) < limit:
+            due.append(queue.popleft())
+    return due
+
+
+def _push_retries(
+    retries: list[tuple[int, int, QueuedLog]], items: list[QueuedLog], seq: Iterator[int], limit: int
+) -> int:
+    """Add logs to the retry heap, ordered by next_attempt_at, holding at most ``limit``.
+
+    Returns:
+        Number of logs dropped because the heap was full
+    """
+    room = max(0, limit - len(retries))
+    for item in items[:room]:
+        # The sequence number breaks ties, so QueuedLogs are never compared
+        heapq.heappush(retries, (item.next_attempt_at, next(seq), item))
+    return max(0, len(items) - room)
+
+
+def _encoded(batch: list[QueuedLog]) -> tuple[list[bytes], list[QueuedLog]]:
+    """Serialize each entry's payload, reusing the bytes from earlier attempts.
+
+    Entries that cannot be serialized are dropped with a warning rather
+    than failing the rest of the batch.
+
+    Returns:
+        Tuple of (encoded payloads, the entries they belong to)
+    """
+    parts: list[bytes] = []
+    kept: list[QueuedLog] = []
+    for item in batch:
+        if item.encoded is None:
+            try:
+                item.encoded = dumps(item.data)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Dropping log that cannot be encoded as JSON: {e}")
+                continue
+        parts.append(item.encoded)
+        kept.append(item)
+    return parts, kept
+
+
+def _schedule_retry(batch: list[QueuedLog], count_attempt: bool = True) -> list[QueuedLog]:
+    """Back off a failed batch and return the entries that should be retried.
+
+    Delays grow exponentially with each counted attempt (capped at
+    MAX_RETRY_DELAY) plus up to a second of jitter, so a struggling server
+    is not hit by every client at once. The jitter is drawn once per batch,
+    so entries on the same attempt stay in order in the retry heap.
+    """
+    now = time.monotonic_ns()
+    jitter = random.random()
+    remaining: list[QueuedLog] = []
+    for item in batch:
+        if count_attempt:
+            item.retry_count += 1
+            if item.retry_count >= item.max_retries:
+                continue
+        delay = min(MAX_RETRY_DELAY, 2 ** item.retry_count) + jitter
+        item.next_attempt_at = now + int(delay * _NS_PER_S)
+        remaining.append(item)
+    return remaining
+
+
+def _log_data(name: str, response: str, prompt: str, model: str) -> dict:
+    """Build a log payload, interning the strings that repeat across calls.
+
+    Prompt names, model names and template-style prompts are usually the
+    same few strings logged thousands of times; interning keeps one copy
+    of each alive in the queue instead of one per log. Prompts of
+    _INTERN_MAX_PROMPT_LEN characters or more are kept as-is: long inputs
+    rarely repeat exactly, so interning them costs a hash and a table
+    lookup with nothing to share.
+
+    sys.intern() only takes exact str, so anything else (str subclasses
+    such as StrEnum members, message lists, None) is passed through as-is.
+    """
+    return {
+        "prompt_name": sys.intern(name) if type(name) is str else name,
+        "response_text": response,
+        "input_text": (
+            sys.intern(prompt) if type(prompt) is str and len(prompt) < _INTERN_MAX_PROMPT_LEN else prompt
+        ),
+        "model": sys.intern(model) if type(model) is str else model,
+    }
+
+
 class LogTask:
     """A pending log operation. Call .invoke() or .submit() to execute."""
 
+    # One LogTask is made per log() call and dropped right after submit()
+    __slots__ = ("_client", "_data")
+
     def __init__(self, client: "DriftBalloon", data: dict):
         self._client = client
         self._data = data
@@ -48,15 +268,17 @@ class LogTask:
 
     def submit(self) -> None:
         """Queue the log for background submission (fire-and-forget)."""
-        entry = QueuedLog(data=self._data)
-        with self._client._queue_lock:
-            self._client._log_queue.append(entry)
+        self._client._enqueue([QueuedLog(data=self._data)])
 
 
 class DriftBalloon:
     """
     DriftBalloon SDK client.
 
+    Create one client at startup and reuse it: each instance owns a pooled
+    connection to the server, so constructing one per log call pays a fresh
+    TCP/TLS handshake every time.
+
     Features:
     - Local-first config cache with 30s sync
     - Offline queue for log submission
@@ -77,6 +299,13 @@ class DriftBalloon:
     """
 
     DEFAULT_BASE_URL = "https://server.driftballoon.com"
+    FLUSH_THRESHOLD = 10  # Queued logs that trigger an early flush
+    MAX_BATCH_SIZE = 50  # Logs sent per flush cycle
+    # Logs per HTTP request; the logs endpoint takes a list, so one POST
+    # carries the whole cycle and pays a single round trip
+    BATCH_POST_SIZE = 50
+    FLUSH_WORKERS = 4  # Log batches posted in parallel
+    MAX_CONCURRENT_FLUSHES = 4  # Flush cycles allowed in flight at once
 
     def __init__(
         self,
@@ -84,6 +313,9 @@ class DriftBalloon:
         base_url: str | None = None,
         sync_interval: float = 30.0,
         auto_start: bool = True,
+        max_queue_size: int = 10_000,
+        compress_logs: bool = False,
+        config_max_age: float | None = None,
     ):
         """
         Initialize DriftBalloon client.
@@ -93,28 +325,81 @@ class DriftBalloon:
             base_url: API base URL (defaults to https://server.driftballoon.com)
             sync_interval: Config sync interval in seconds (default 30)
             auto_start: Start background sync automatically (default True)
+            max_queue_size: Maximum number of queued logs kept while the server
+                is unreachable, and separately of failed logs awaiting a
+                retry; the oldest queued entries are dropped first (default 10000)
+            compress_logs: Gzip log request bodies of 1 KB or more; enable only if
+                the server accepts gzip request bodies (default False)
+            config_max_age: If set, a config read refreshes the cache inline
+                when no sync has been attempted for this many seconds, e.g.
+                on auto_start=False clients (default None: never)
         """
         if not api_key or not api_key.startswith("db_sk_"):
             raise ValueError("Invalid API key format. Must start with 'db_sk_'")
 
         self.api_key = api_key
         self.base_url = (base_url or self.DEFAULT_BASE_URL).rstrip("/")
+        self._logs_url = f"{self.base_url}/api/v1/logs"
+        self._config_url = f"{self.base_url}/api/v1/config"
         self._sync_interval = sync_interval
+        self._sync_interval_ns = int(sync_interval * _NS_PER_S)
+        self._compress_logs = compress_logs
+        self._config_max_age_ns = None if config_max_age is None else int(config_max_age * _NS_PER_S)
 
-        # Local config cache
-        self._config_cache: dict[str, PromptConfig] = {}
-        self._config_lock = threading.Lock()
+        # Without a background thread nothing else touches the queue or cache,
+        # so auto_start=False clients use no-op locks until start() is called.
+        lock_factory = threading.Lock if auto_start else contextlib.nullcontext
 
-        # Log queue
-        self._log_queue: list[QueuedLog] = []
-        self._queue_lock = threading.Lock()
+        # Local config cache. Replaced wholesale on each sync and read without
+        # locking; the lock only serializes writers.
+        self._config_cache: dict[str, PromptConfig] = {}
+        self._config_lock = lock_factory()
+        # Bumped each time a sync publishes a new cache
+        self._config_version = 0
+        # ETag of the last config body applied; sent as If-None-Match
+        self._config_etag: str | None = None
+        # time.monotonic_ns() of the last sync attempt, successful or not
+        self._config_checked_at = _NS_NEVER
+        # Lets one reader refresh a stale cache while the others keep reading
+        self._refresh_lock = threading.Lock()
+        # Memoized get_active_prompt() results; reset on every config sync
+        self._active_prompt_cache: dict[str, str | None] = {}
+
+        # Log queue. deque append/extend/popleft are atomic, so submit() never
+        # locks; the lock only guards the flush-side bookkeeping below.
+        self._log_queue: deque[QueuedLog] = deque(maxlen=max_queue_size)
+        self._queue_lock = lock_factory()
+        # Failed logs waiting out their backoff, as a heap of
+        # (next_attempt_at, seq, log); guarded by _queue_lock
+        self._retry_queue: list[tuple[int, int, QueuedLog]] = []
+        self._retry_seq = itertools.count()
+        # Logs dropped because the queue was full; guarded by _queue_lock
+        self._overflow_count = 0
+        # Caps concurrent _flush_logs() calls (worker, stop(), direct callers)
+        self._flush_slots = threading.Semaphore(self.MAX_CONCURRENT_FLUSHES)
+        # Flushes holding logs outside the queue; guarded by _queue_lock
+        self._flushes_in_flight = 0
+        # Threads blocked in wait_drained(); guarded by _queue_lock
+        self._drain_waiters = 0
+        # Set whenever a flush leaves nothing queued or in flight
+        self._drained = threading.Event()
 
         # Background sync
         self._running = False
         self._sync_thread: threading.Thread | None = None
-
-        # HTTP client
+        self._wake = threading.Event()
+        # time.monotonic_ns() the next config sync is due; 0 syncs on the first cycle
+        self._next_sync_at = 0
+        # time.monotonic_ns() the earliest retry comes out of backoff
+        self._next_retry_at: int | None = None
+        # After a failed cycle, time.monotonic_ns() before which fresh logs
+        # neither wake the worker nor get sent; 0 when the server is healthy
+        self._backoff_until = 0
+
+        # HTTP client and batch posting pool
         self._http_client: httpx.Client | None = None
+        self._http_client_lock = threading.Lock()
+        self._flush_pool: ThreadPoolExecutor | None = None
 
         if auto_start:
             self.start()
@@ -122,18 +407,45 @@ class DriftBalloon:
     @property
     def http_client(self) -> httpx.Client:
         """Get or create HTTP client."""
-        if self._http_client is None:
-            self._http_client = httpx.Client(
-                timeout=10.0,
-                headers={"X-API-Key": self.api_key},
+        client = self._http_client
+        if client is None:
+            # The worker thread and callers of invoke() may race to create it;
+            # only one pool may win, or the loser's connections leak.
+            with self._http_client_lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(**_http_client_options(self.api_key, self._sync_interval))
+                client = self._http_client
+        return client
+
+    @property
+    def config_version(self) -> int:
+        """Number of config syncs published so far; changes whenever the cache does."""
+        return self._config_version
+
+    @property
+    def queue_overflow_count(self) -> int:
+        """Number of logs dropped so far because the queue hit max_queue_size."""
+        return self._overflow_count
+
+    def _get_flush_pool(self) -> ThreadPoolExecutor:
+        """Get or create the thread pool used to post log batches in parallel."""
+        if self._flush_pool is None:
+            self._flush_pool = ThreadPoolExecutor(
+                max_workers=self.FLUSH_WORKERS,
+                thread_name_prefix="db-flush",
             )
-        return self._http_client
+        return self._flush_pool
 
     def start(self):
         """Start background sync thread."""
         if self._running:
             return
 
+        if isinstance(self._queue_lock, contextlib.nullcontext):
+            # Upgrade to real locks before the worker thread can contend
+            self._config_lock = threading.Lock()
+            self._queue_lock = threading.Lock()
+
         self._running = True
         self._sync_thread = threading.Thread(target=self._background_worker, daemon=True)
         self._sync_thread.start()
@@ -142,13 +454,17 @@ class DriftBalloon:
 
     def stop(self):
         """Stop background sync and flush remaining logs."""
-        if not self._running and not self._log_queue:
-            return
-
-        self._running = False
-        if self._sync_thread:
-            self._sync_thread.join(timeout=5.0)
-        self._flush_logs()
+        if self._running or self._log_queue or self._retry_queue:
+            self._running = False
+            self._wake.set()
+            if self._sync_thread:
+                self._sync_thread.join(timeout=5.0)
+            self._flush_logs(ignore_backoff=True)
+
+        # Release the pool even on a never-started client that used invoke()
+        if self._flush_pool:
+            self._flush_pool.shutdown(wait=True)
+            self._flush_pool = None
 
         if self._http_client:
             self._http_client.close()
@@ -167,6 +483,9 @@ class DriftBalloon:
         Returns a LogTask — call .submit() for fire-and-forget or
         .invoke() to block until the server confirms receipt.
 
+        Prompt names, model names and short prompts are interned, so use
+        stable names rather than per-request unique ones.
+
         Args:
             name: Name of the prompt
             response: The LLM response text
@@ -176,14 +495,43 @@ class DriftBalloon:
         Returns:
             LogTask with .invoke() and .submit() methods
         """
-        data = {
-            "prompt_name": name,
-            "response_text": response,
-            "input_text": prompt,
-            "model": model,
-        }
+        data = _log_data(name, response, prompt, model)
         return LogTask(self, data)
 
+    def log_submit(
+        self,
+        name: str,
+        response: str,
+        prompt: str,
+        model: str,
+    ) -> None:
+        """
+        Queue an LLM response for background submission (fire-and-forget).
+
+        Same as ``log(...).submit()`` without building the intermediate
+        LogTask, for hot call sites.
+
+        Args:
+            name: Name of the prompt
+            response: The LLM response text
+            prompt: The input prompt sent to the LLM
+            model: The LLM model used
+        """
+        self._enqueue([QueuedLog(data=_log_data(name, response, prompt, model))])
+
+    def log_many(self, entries: list[dict]) -> None:
+        """
+        Queue several LLM responses for background submission at once.
+
+        Equivalent to calling ``log(**entry).submit()`` for each entry, but
+        appends the whole burst to the queue in one call.
+
+        Args:
+            entries: Dicts with the same keys as log() arguments
+                (name, response, prompt, model)
+        """
+        self._enqueue([QueuedLog(data=_log_data(**entry)) for entry in entries])
+
     def get_active_prompt(self, name: str) -> str | None:
         """
         Get the currently active prompt version.
@@ -197,13 +545,21 @@ class DriftBalloon:
         Returns:
             "a" or "b", or None if not found
         """
-        with self._config_lock:
-            config = self._config_cache.get(name)
+        if self._config_max_age_ns is not None:
+            self._refresh_if_stale()
 
-        if not config:
-            return None
+        # Read the memo before the cache: a sync publishes the cache first,
+        # so a fresh memo never gets filled from a stale cache.
+        memo = self._active_prompt_cache
+        try:
+            return memo[name]
+        except KeyError:
+            pass
 
-        return config.active_prompt
+        config = self._config_cache.get(name)
+        active = config.active_prompt if config else None
+        memo[name] = active
+        return active
 
     def get_config(self, name: str) -> PromptConfig | None:
         """
@@ -215,8 +571,9 @@ class DriftBalloon:
         Returns:
             PromptConfig or None if not found
         """
-        with self._config_lock:
-            return self._config_cache.get(name)
+        if self._config_max_age_ns is not None:
+            self._refresh_if_stale()
+        return self._config_cache.get(name)
 
     def get_baseline_status(self, name: str) -> tuple[str, int]:
         """
@@ -228,120 +585,274 @@ class DriftBalloon:
         Returns:
             Tuple of (status: "learning"|"ready", sample_count)
         """
-        with self._config_lock:
-            config = self._config_cache.get(name)
+        if self._config_max_age_ns is not None:
+            self._refresh_if_stale()
+        config = self._config_cache.get(name)
 
         if not config:
             return ("learning", 0)
 
         return (config.baseline_status, config.baseline_sample_count)
 
+    def sync_and_get(self, name: str) -> tuple[PromptConfig | None, tuple[str, int]]:
+        """
+        Sync config from the server now, then read one prompt from the fresh cache.
+
+        One config request instead of waiting for the next background sync;
+        useful right after a prompt is first logged.
+
+        Args:
+            name: Name of the prompt
+
+        Returns:
+            Tuple of (get_config(name), get_baseline_status(name))
+        """
+        self._sync_config()
+        return (self.get_config(name), self.get_baseline_status(name))
+
+    def wait_drained(self, timeout: float | None = None) -> bool:
+        """
+        Wake the background worker and block until every queued log is sent.
+
+        Logs that exhaust their retries count as sent. Only meaningful on a
+        started client, since nothing else drains the queue.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if the queue drained, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # While a waiter is registered the worker keeps flushing past a
+        # short remainder instead of sleeping until the next sync
+        with self._queue_lock:
+            self._drain_waiters += 1
+        try:
+            self._wake.set()
+            while self._log_queue or self._retry_queue or self._flushes_in_flight:
+                # Clear, then re-check: a flush finishing in between has already
+                # emptied the queue, and one finishing later sets the event again.
+                self._drained.clear()
+                if not self._log_queue and not self._retry_queue and not self._flushes_in_flight:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+            return True
+        finally:
+            with self._queue_lock:
+                self._drain_waiters -= 1
+
+    def _refresh_if_stale(self) -> None:
+        """Sync config inline if no sync was attempted within config_max_age.
+
+        Only one caller refreshes at a time; concurrent readers carry on with
+        the cached config rather than queueing up behind the request.
+        """
+        if time.monotonic_ns() - self._config_checked_at < self._config_max_age_ns:
+            return
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self._sync_config()
+            finally:
+                self._refresh_lock.release()
+
+    def _enqueue(self, entries: list[QueuedLog]) -> None:
+        """Append entries to the log queue without taking a lock."""
+        queue = self._log_queue
+        dropped = _overflow(queue, len(entries))
+        queue.extend(entries)
+        if dropped:
+            with self._queue_lock:
+                self._overflow_count += dropped
+
+        # Wake the worker as soon as a full batch is waiting; retries in
+        # backoff live apart, so everything counted here is due now. While
+        # the server is failing, the next retry decides when to try again.
+        if len(queue) >= self.FLUSH_THRESHOLD and time.monotonic_ns() >= self._backoff_until:
+            self._wake.set()
+
     def _send_log_sync(self, data: dict) -> None:
         """Send a single log entry synchronously."""
+        content, headers = encode_logs([data], compress=self._compress_logs)
         self.http_client.post(
-            f"{self.base_url}/api/v1/logs",
-            json={"logs": [data]},
+            self._logs_url,
+            content=content,
+            headers=headers,
         )
 
     def _background_worker(self):
-        """Background thread for config sync and log submission."""
+        """Background thread for config sync and log submission.
+
+        The first cycle runs as soon as the thread starts rather than after
+        sync_interval, so its config GET also opens the pooled TCP/TLS
+        connection before the first log is sent.
+
+        Config syncs keep to sync_interval. Logs are flushed on every wake,
+        and while a backlog remains the worker flushes again straight away
+        instead of sleeping. Otherwise the one thread sleeps until whichever
+        comes first: the next sync or the earliest retry leaving backoff.
+        """
         while self._running:
+            sent = 0
             try:
-                self._sync_config()
-                self._flush_logs()
+                now = time.monotonic_ns()
+                if now >= self._next_sync_at:
+                    self._next_sync_at = now + self._sync_interval_ns
+                    # Both calls are independent round trips; overlap them
+                    sync = self._get_flush_pool().submit(self._sync_config)
+                    sent = self._flush_logs()
+                    sync.result()
+                else:
+                    sent = self._flush_logs()
             except Exception as e:
                 logger.error(f"Background worker error: {e}")
 
-            time.sleep(self._sync_interval)
+            # A full cycle was accepted and another batch is already waiting,
+            # or any remainder while wait_drained() is pending; after any
+            # failure, wait for the next wake instead of retrying at once
+            backlog = len(self._log_queue)
+            if sent >= self.MAX_BATCH_SIZE and (
+                backlog >= self.FLUSH_THRESHOLD or (backlog and self._drain_waiters)
+            ):
+                continue
+
+            wake_at = self._next_sync_at
+            if self._next_retry_at is not None:
+                wake_at = min(wake_at, self._next_retry_at)
+            self._wake.wait(timeout=max(0, wake_at - time.monotonic_ns()) / _NS_PER_S)
+            self._wake.clear()
 
     def _sync_config(self):
         """Fetch latest config from server and populate cache for all prompts."""
+        self._config_checked_at = time.monotonic_ns()
         try:
-            response = self.http_client.get(
-                f"{self.base_url}/api/v1/config",
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                prompts = data.get("prompts", {})
-
+            # A conditional GET: an unchanged config comes back as an empty 304
+            headers = {"If-None-Match": self._config_etag} if self._config_etag else None
+            with self.http_client.stream("GET", self._config_url, headers=headers) as response:
+                if response.status_code == 304:
+                    logger.debug("Config unchanged on server")
+                    return
+                if response.status_code != 200:
+                    return
+
+                # Copy-on-write: merge into a copy and publish it with a single
+                # attribute rebind, so readers never need the lock.
                 with self._config_lock:
-                    for name, config_data in prompts.items():
-                        if name in self._config_cache:
-                            # Update existing cached prompt
-                            existing = self._config_cache[name]
-                            existing.active_prompt = config_data.get("active_prompt", existing.active_prompt)
-                            existing.baseline_status = config_data.get("baseline_status", existing.baseline_status)
-                            existing.baseline_sample_count = config_data.get("baseline_sample_count", existing.baseline_sample_count)
-                            existing.min_baseline_samples = config_data.get("min_baseline_samples", existing.min_baseline_samples)
-                            existing.drift_threshold = config_data.get("drift_threshold", existing.drift_threshold)
-                            existing.length_drift_threshold = config_data.get("length_drift_threshold", existing.length_drift_threshold)
-                            existing.auto_switch_enabled = config_data.get("auto_switch_enabled", existing.auto_switch_enabled)
-                            existing.status = config_data.get("status", existing.status)
-                        else:
-                            # Add new prompt to cache
-                            self._config_cache[name] = PromptConfig(
-                                name=name,
-                                active_prompt=config_data.get("active_prompt", "a"),
-                                baseline_status=config_data.get("baseline_status", "learning"),
-                                baseline_sample_count=config_data.get("baseline_sample_count", 0),
-                                min_baseline_samples=config_data.get("min_baseline_samples", 30),
-                                drift_threshold=config_data.get("drift_threshold", 0.7),
-                                length_drift_threshold=config_data.get("length_drift_threshold", 1.5),
-                                auto_switch_enabled=config_data.get("auto_switch_enabled", True),
-                                status=config_data.get("status", "active"),
-                            )
-
-                logger.debug("Config synced from server")
+                    cache = dict(self._config_cache)
+                    if should_stream(response.headers.get("content-length")):
+                        parser = ConfigStreamParser()
+                        for chunk in response.iter_bytes():
+                            _merge_prompt_configs(cache, parser.feed(chunk))
+                        _merge_prompt_configs(cache, parser.close())
+                    else:
+                        data = loads(response.read())
+                        _merge_prompt_configs(cache, data.get("prompts", {}).items())
+                    self._config_cache = cache
+                    self._active_prompt_cache = {}
+                    self._config_version += 1
+                    self._config_etag = response.headers.get("etag")
+
+            logger.debug("Config synced from server")
 
         except Exception as e:
             logger.debug(f"Config sync failed (using cached): {e}")
 
-    def _flush_logs(self):
-        """Send queued logs to server with batching."""
-        MAX_BATCH_SIZE = 50  # Cap per cycle
-        BATCH_POST_SIZE = 10  # Logs per HTTP request
+    def _flush_logs(self, ignore_backoff: bool = False):
+        """Send queued logs to server with batching.
+
+        Args:
+            ignore_backoff: Also send logs still waiting out a retry delay
+                (used for the final flush on stop)
+
+        Returns:
+            Number of logs the server accepted this cycle; 0 when skipped
+            because MAX_CONCURRENT_FLUSHES are already running
+        """
+        # A periodic flush that finds every slot busy is skipped rather than
+        # piling up behind the others; the final flush on stop() waits.
+        if not self._flush_slots.acquire(timeout=None if ignore_backoff else 0.1):
+            return 0
+
+        # Pop straight off the live queue; submit() keeps appending meanwhile
+        now = _NS_FOREVER if ignore_backoff else time.monotonic_ns()
+        with self._queue_lock:
+            self._flushes_in_flight += 1
+            to_process = _take_due(
+                self._retry_queue, self._log_queue, self.MAX_BATCH_SIZE, now, self._backoff_until
+            )
 
+        retries: list[QueuedLog] = []
+        try:
+            if not to_process:
+                return 0
+
+            batches = [
+                to_process[i:i + self.BATCH_POST_SIZE]
+                for i in range(0, len(to_process), self.BATCH_POST_SIZE)
+            ]
+            if len(batches) == 1:
+                results = [self._post_batch(batches[0])]
+            else:
+                # Batches are independent; post them in parallel over the shared pool
+                results = list(self._get_flush_pool().map(self._post_batch, batches))
+
+            retries = [item for _, failed in results for item in failed]
+            return sum(accepted for accepted, _ in results)
+        finally:
+            self._requeue(retries, attempted=bool(to_process))
+            self._flush_slots.release()
+
+    def _requeue(self, retries: list[QueuedLog], attempted: bool = True) -> None:
+        """Move retries into the backoff heap and signal wait_drained() once
+        nothing is left to send. ``attempted`` is False for a cycle that
+        posted nothing, which says nothing about the server's health."""
         with self._queue_lock:
-            to_process = self._log_queue[:MAX_BATCH_SIZE]
-            self._log_queue = self._log_queue[MAX_BATCH_SIZE:]
+            # Retries beyond max_queue_size are dropped, which still counts as overflow
+            self._overflow_count += _push_retries(
+                self._retry_queue, retries, self._retry_seq, self._log_queue.maxlen
+            )
+            self._next_retry_at = self._retry_queue[0][0] if self._retry_queue else None
+            if attempted:
+                # A failed cycle holds back fresh logs until the next retry
+                # probes the server again; a cycle that fully succeeds lifts it
+                self._backoff_until = self._next_retry_at if retries else 0
+            self._flushes_in_flight -= 1
+            drained = not self._log_queue and not self._retry_queue and not self._flushes_in_flight
 
-        if not to_process:
-            return
+        if drained:
+            self._drained.set()
 
-        remaining: list[QueuedLog] = []
+    def _post_batch(self, batch: list[QueuedLog]) -> tuple[int, list[QueuedLog]]:
+        """POST one batch of logs.
 
-        # Send logs in batches
-        for i in range(0, len(to_process), BATCH_POST_SIZE):
-            batch = to_process[i:i + BATCH_POST_SIZE]
+        Returns:
+            Tuple of (number of logs the server accepted, entries to retry)
+        """
+        parts, batch = _encoded(batch)
+        if not batch:
+            return 0, []
+        try:
+            content, headers = encode_log_batch(parts, compress=self._compress_logs)
+            response = self.http_client.post(
+                self._logs_url,
+                content=content,
+                headers=headers,
+            )
 
-            try:
-                response = self.http_client.post(
-                    f"{self.base_url}/api/v1/logs",
-                    json={"logs": [item.data for item in batch]},
-                )
-
-                if response.status_code == 429:
-                    # Rate limited - re-queue batch
-                    remaining.extend(batch)
-                elif response.status_code not in (200, 201, 202):
-                    # Other error - retry with backoff
-                    for item in batch:
-                        item.retry_count += 1
-                        if item.retry_count < item.max_retries:
-                            remaining.append(item)
+            if response.status_code == 429:
+                # Rate limited - back off without spending a retry
+                return 0, _schedule_retry(batch, count_attempt=False)
+            if response.status_code in (200, 201, 202):
+                return len(batch), []
 
-            except Exception as e:
-                logger.debug(f"Log submission failed: {e}")
-                for item in batch:
-                    item.retry_count += 1
-                    if item.retry_count < item.max_retries:
-                        remaining.append(item)
-
-        # Re-queue failed items
-        if remaining:
-            with self._queue_lock:
-                self._log_queue = remaining + self._log_queue
+        except Exception as e:
+            logger.debug(f"Log submission failed: {e}")
+
+        # Error - retry with backoff
+        return 0, _schedule_retry(batch)
 
     def __enter__(self):
         """Context manager entry."""
@@ -6,6 +6,8 @@ from uuid import uuid4
 import httpx
 import pytest
 
+from driftballoon import DriftBalloon
+
 
 def _backend_is_running(url: str) -> bool:
     """Check if the local backend is reachable."""
@@ -86,3 +88,36 @@ def test_api_key(test_credentials: tuple[str, str]) -> str:
 def test_jwt_token(test_credentials: tuple[str, str]) -> str:
     """Convenience fixture – just the JWT token."""
     return test_credentials[1]
+
+
+@pytest.fixture(scope="session")
+def shared_db(test_api_key: str, backend_url: str):
+    """One DriftBalloon client (auto_start=False) reused across the session.
+
+    Reusing the client keeps its pooled connection open, so tests after the
+    first skip the TCP/TLS handshake.
+    """
+    client = DriftBalloon(api_key=test_api_key, base_url=backend_url, auto_start=False)
+    yield client
+    client.stop()
+
+
+@pytest.fixture(scope="session")
+def warmup(shared_db: DriftBalloon) -> None:
+    """Send one log through the session client before the first test.
+
+    Moves the TLS handshake and the backend's cold start out of whichever
+    test happens to run first. Not autouse: unit tests must not need a backend.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    shared_db.log(name=f"integ-warmup-{worker}", response="warm", prompt="warm", model="warmup").invoke()
+
+
+@pytest.fixture
+def db(shared_db: DriftBalloon) -> DriftBalloon:
+    """The session client with empty log and retry queues for each test."""
+    shared_db._log_queue.clear()
+    shared_db._retry_queue.clear()
+    shared_db._next_retry_at = None
+    shared_db._backoff_until = 0
+    return shared_db
@@ -0,0 +1,464 @@
+"""Tests for the asyncio DriftBalloon SDK client."""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+import respx
+
+from driftballoon import AsyncDriftBalloon, AsyncLogTask
+from driftballoon.client import PromptConfig, QueuedLog, _push_retries
+
+
+def _retries(db) -> list[QueuedLog]:
+    """Logs waiting in the client's retry heap, earliest attempt first."""
+    return [item for *_, item in sorted(db._retry_queue)]
+
+
+class TestAsyncDriftBalloonInit:
+    """Tests for AsyncDriftBalloon initialization."""
+
+    def test_init_without_running_loop_defers_start(self):
+        """Test that auto_start outside an event loop does not start a task."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab")
+        assert db._running is False
+        assert db._sync_task is None
+
+    def test_submit_without_running_loop_warns_once(self, caplog):
+        """Test that logs queued with no loop to send them are not silently stranded."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab")
+
+        with caplog.at_level("WARNING", logger="driftballoon.async_client"):
+            db.log_submit(name="test", response="r", prompt="p", model="m")
+            db.log_submit(name="test", response="r", prompt="p", model="m")
+
+        assert len(db._log_queue) == 2
+        assert len([r for r in caplog.records if "no running event loop" in r.message]) == 1
+
+    async def test_first_submit_on_loop_starts_deferred_task(self):
+        """Test that a client built at import time starts on its first submit from async code."""
+        db = await asyncio.to_thread(AsyncDriftBalloon, api_key="db_sk_test1234567890ab", sync_interval=60.0)
+        assert db._running is False
+
+        db._sync_config = lambda: asyncio.sleep(0)
+        db.log(name="test", response="r", prompt="p", model="m").submit()
+        try:
+            assert db._running is True
+            assert db._sync_task is not None
+        finally:
+            await db.stop()
+
+    async def test_auto_start_false_never_starts_on_submit(self):
+        """Test that auto_start=False keeps the task stopped on submit."""
+        db = await asyncio.to_thread(AsyncDriftBalloon, api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db.log_submit(name="test", response="r", prompt="p", model="m")
+
+        assert db._running is False
+
+    def test_init_with_invalid_api_key(self):
+        """Test initialization with invalid API key raises error."""
+        with pytest.raises(ValueError, match="Invalid API key format"):
+            AsyncDriftBalloon(api_key="invalid_key")
+
+    async def test_init_inside_loop_starts_task(self):
+        """Test that auto_start inside a running loop starts the sync task."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0)
+        try:
+            assert db._running is True
+            assert db._sync_task is not None
+        finally:
+            await db.stop()
+
+        assert db._running is False
+        assert db._sync_task is None
+
+    async def test_stop_closes_http_client_when_never_started(self):
+        """Test that stop() releases the pool on a client that only used invoke()."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        client = db.http_client
+
+        await db.stop()
+
+        assert client.is_closed
+        assert db._http_client is None
+
+
+class TestAsyncLog:
+    """Tests for async log submission."""
+
+    def test_submit_queues_entry(self):
+        """Test that .submit() adds entry to queue."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        task = db.log(name="test-prompt", response="Test response", prompt="Test input", model="gpt-4")
+        assert isinstance(task, AsyncLogTask)
+        assert len(db._log_queue) == 0  # Not queued until .submit()
+
+        task.submit()
+        assert len(db._log_queue) == 1
+        assert db._log_queue[0].data["prompt_name"] == "test-prompt"
+
+    async def test_submit_wakes_worker_at_threshold(self):
+        """Test that a full batch of submits wakes the background task."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._wake = asyncio.Event()
+
+        for i in range(AsyncDriftBalloon.FLUSH_THRESHOLD):
+            db.log(name="test-prompt", response=f"Response {i}", prompt="Input", model="gpt-4").submit()
+
+        assert db._wake.is_set()
+
+    def test_log_submit_queues_same_payload_as_builder(self):
+        """Test that log_submit() queues exactly what log().submit() does."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db.log_submit(name="test-prompt", response="R", prompt="P", model="gpt-4")
+        db.log(name="test-prompt", response="R", prompt="P", model="gpt-4").submit()
+
+        assert db._log_queue[0].data == db._log_queue[1].data
+
+    def test_log_many_queues_all_entries(self):
+        """Test that log_many() queues every entry in order."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db.log_many([
+            {"name": "prompt1", "response": f"Response {i}", "prompt": "Input", "model": "gpt-4"}
+            for i in range(3)
+        ])
+
+        assert [e.data["response_text"] for e in db._log_queue] == ["Response 0", "Response 1", "Response 2"]
+
+    def test_submit_counts_overflow_when_queue_full(self):
+        """Test that logs dropped by a full queue are counted."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, max_queue_size=2)
+
+        for i in range(5):
+            db.log(name="test-prompt", response=f"Response {i}", prompt="Input", model="gpt-4").submit()
+
+        assert len(db._log_queue) == 2
+        assert db.queue_overflow_count == 3
+
+    @respx.mock
+    async def test_invoke_sends_immediately(self, respx_mock):
+        """Test that awaiting .invoke() sends the log directly."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted", "count": 1})
+        )
+
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        await db.log(name="test-prompt", response="Async response", prompt="Async input", model="gpt-4").invoke()
+
+        assert route.called
+        assert len(db._log_queue) == 0
+        await db.stop()
+
+
+class TestAsyncConfigSync:
+    """Tests for async config synchronization."""
+
+    @respx.mock
+    async def test_sync_config_updates_cache(self, respx_mock):
+        """Test that _sync_config updates and adds cached prompts."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={
+                "prompts": {
+                    "test-prompt": {"active_prompt": "b", "baseline_status": "ready", "baseline_sample_count": 50},
+                    "new-prompt": {"baseline_sample_count": 10},
+                },
+                "cache_ttl_seconds": 30
+            })
+        )
+
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._config_cache["test-prompt"] = PromptConfig(name="test-prompt", active_prompt="a")
+
+        await db._sync_config()
+
+        assert db.get_active_prompt("test-prompt") == "b"
+        assert db.get_baseline_status("test-prompt") == ("ready", 50)
+        assert db.get_config("new-prompt").baseline_sample_count == 10
+
+    @respx.mock
+    async def test_sync_config_sends_etag_and_keeps_cache_on_304(self, respx_mock):
+        """Test that a repeat sync is conditional and a 304 leaves the cache alone."""
+        route = respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(side_effect=[
+            httpx.Response(200, json={"prompts": {"test-prompt": {"active_prompt": "b"}}}, headers={"ETag": '"v1"'}),
+            httpx.Response(304),
+        ])
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        await db._sync_config()
+        await db._sync_config()
+
+        assert route.calls[1].request.headers["if-none-match"] == '"v1"'
+        assert db.get_active_prompt("test-prompt") == "b"
+        assert db.config_version == 1
+
+    @respx.mock
+    async def test_sync_and_get_returns_fresh_config_and_status(self, respx_mock):
+        """Test that sync_and_get() syncs first and reads from the new cache."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {
+                "test-prompt": {"baseline_status": "ready", "baseline_sample_count": 42},
+            }})
+        )
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        config, status = await db.sync_and_get("test-prompt")
+
+        assert config.name == "test-prompt"
+        assert status == ("ready", 42)
+
+    @respx.mock
+    async def test_sync_config_handles_server_error(self, respx_mock):
+        """Test that _sync_config keeps cached config on server errors."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(500)
+        )
+
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._config_cache["test-prompt"] = PromptConfig(name="test-prompt", active_prompt="a")
+
+        await db._sync_config()
+
+        assert db.get_active_prompt("test-prompt") == "a"
+
+    @respx.mock
+    async def test_sync_config_failed_stream_publishes_nothing(self, respx_mock):
+        """Test that a streamed sync cut off mid-body leaves cache and memo consistent."""
+        pytest.importorskip("ijson")
+
+        async def body():
+            yield b'{"prompts": {"test-prompt": {"active_prompt": "b"}, "new-prompt": {"active_'
+            raise httpx.ReadError("connection reset")
+
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, content=body())
+        )
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._config_cache["test-prompt"] = PromptConfig(name="test-prompt", active_prompt="a")
+        assert db.get_active_prompt("test-prompt") == "a"
+
+        await db._sync_config()
+
+        assert db.get_config("test-prompt").active_prompt == "a"
+        assert db.get_active_prompt("test-prompt") == "a"
+        assert db.config_version == 0
+
+    async def test_config_max_age_wakes_worker_on_stale_read(self):
+        """Test that a stale read wakes the background task instead of blocking."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, config_max_age=60.0)
+        db._wake = asyncio.Event()
+
+        db.get_active_prompt("test-prompt")
+        assert db._wake.is_set()
+
+        db._wake.clear()
+        db.get_config("test-prompt")
+        assert not db._wake.is_set()
+
+
+class TestAsyncFlushLogs:
+    """Tests for async log flushing."""
+
+    async def test_flush_skipped_when_all_slots_busy(self):
+        """Test that a periodic flush gives up when MAX_CONCURRENT_FLUSHES are running."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.append(QueuedLog(data={"prompt_name": "test"}))
+        db._flush_slots = asyncio.Semaphore(0)
+
+        assert await db._flush_logs() == 0
+        assert len(db._log_queue) == 1
+
+    @respx.mock
+    async def test_flush_logs_posts_batches_concurrently(self, respx_mock):
+        """Test that _flush_logs posts every batch and drains the queue."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted"})
+        )
+
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db.BATCH_POST_SIZE = 10
+        db._log_queue.extend([QueuedLog(data={"prompt_name": "test", "response_text": f"Response {i}"}) for i in range(25)])
+
+        await db._flush_logs()
+
+        assert route.call_count == 3
+        assert len(db._log_queue) == 0
+
+    @respx.mock
+    async def test_flush_logs_requeues_on_rate_limit(self, respx_mock):
+        """Test that _flush_logs requeues on 429."""
+        respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(429, json={"error": "Rate limited"})
+        )
+
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.extend([QueuedLog(data={"prompt_name": "test", "response_text": "Response 1"})])
+
+        await db._flush_logs()
+
+        assert len(db._log_queue) == 0
+        assert [e.retry_count for e in _retries(db)] == [0]
+
+    @respx.mock
+    async def test_flush_logs_retries_and_drops(self, respx_mock):
+        """Test that _flush_logs retries up to max_retries then drops."""
+        respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            side_effect=httpx.ConnectError("unreachable")
+        )
+
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.extend([
+            QueuedLog(data={"prompt_name": "test"}, retry_count=4, max_retries=5),
+            QueuedLog(data={"prompt_name": "test"}),
+        ])
+
+        await db._flush_logs()
+
+        assert [e.retry_count for e in _retries(db)] == [1]
+
+    @respx.mock
+    async def test_outage_does_not_hammer_the_server(self, respx_mock):
+        """Test that after a failed cycle, new submits wait for the retry instead of waking the task."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(503)
+        )
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0)
+
+        for i in range(1000):
+            db.log_submit(name="test", response=f"r{i}", prompt="p", model="m")
+            if i % 100 == 0:
+                await asyncio.sleep(0.05)
+        await asyncio.sleep(0.3)
+        posts_during_outage = route.call_count
+
+        await db.stop()
+
+        assert 1 <= posts_during_outage <= 2
+        assert db._backoff_until > 0
+
+
+class TestAsyncBackgroundWorker:
+    """Tests for the background sync task."""
+
+    async def test_first_sync_runs_immediately_on_start(self):
+        """Test that start() syncs config right away, warming the connection."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, sync_interval=60.0)
+        synced = asyncio.Event()
+
+        async def fake_sync():
+            synced.set()
+
+        db._sync_config = fake_sync
+        db.start()
+        try:
+            await asyncio.wait_for(synced.wait(), timeout=2.0)
+        finally:
+            await db.stop()
+
+    async def test_worker_overlaps_sync_and_flush(self):
+        """Test that config sync and log flush run concurrently each cycle."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._wake = asyncio.Event()
+        started = []
+
+        async def fake_sync():
+            started.append("sync")
+            await asyncio.sleep(0)
+            assert "flush" in started
+
+        async def fake_flush():
+            started.append("flush")
+            db._running = False
+            await asyncio.sleep(0)
+            assert "sync" in started
+            return 0
+
+        db._sync_config = fake_sync
+        db._flush_logs = fake_flush
+        db._running = True
+        db._sync_interval_ns = 0
+        await asyncio.wait_for(db._background_worker(), timeout=2.0)
+
+        assert sorted(started) == ["flush", "sync"]
+
+    async def test_wait_drained_returns_once_queue_is_sent(self, respx_mock):
+        """Test that wait_drained() wakes the task and returns after the flush."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(201)
+        )
+        async with AsyncDriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0) as db:
+            db.log(name="test", response="r", prompt="p", model="m").submit()
+            assert await db.wait_drained(timeout=2.0)
+
+        assert route.called
+
+    @respx.mock
+    async def test_wait_drained_sends_remainder_below_threshold(self, respx_mock):
+        """Test that wait_drained() does not strand a partial batch until the next sync."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202)
+        )
+        async with AsyncDriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0) as db:
+            await asyncio.sleep(0.2)  # Let the first cycle finish so the task is asleep
+            db._log_queue.extend(QueuedLog(data={"n": i}) for i in range(55))
+
+            assert await db.wait_drained(timeout=2.0)
+            assert route.call_count == 2
+
+    async def test_wait_drained_times_out_while_logs_back_off(self):
+        """Test that wait_drained() gives up when queued logs cannot be sent yet."""
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        item = QueuedLog(data={"prompt_name": "test"}, next_attempt_at=time.monotonic_ns() + 60 * 10**9)
+        _push_retries(db._retry_queue, [item], db._retry_seq, db._log_queue.maxlen)
+
+        assert await db.wait_drained(timeout=0.05) is False
+
+
+class TestAsyncContextManager:
+    """Tests for async context manager usage."""
+
+    async def test_context_manager_starts_and_stops(self):
+        """Test that async with runs the sync task and stops it on exit."""
+        async with AsyncDriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0) as db:
+            assert db._running is True
+
+        assert db._running is False
+
+    @respx.mock
+    async def test_stop_during_slow_post_keeps_in_flight_logs(self, respx_mock):
+        """Test that stop() lets an in-flight flush finish instead of losing its batch."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        received = []
+
+        async def slow_post(request):
+            await asyncio.sleep(0.3)
+            received.extend(json.loads(request.content)["logs"])
+            return httpx.Response(202)
+
+        respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(side_effect=slow_post)
+
+        db = AsyncDriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0)
+        db.log_many([{"name": "test", "response": f"r{i}", "prompt": "p", "model": "m"} for i in range(12)])
+        await asyncio.sleep(0.1)
+        assert db._flushes_in_flight == 1
+
+        await db.stop()
+
+        assert len(received) == 12
+        assert len(db._log_queue) == 0
@@ -1,5 +1,12 @@
 """Tests for DriftBalloon SDK client."""
 
+import contextlib
+import gzip
+import json
+import sys
+import threading
+import time
+
 import pytest
 from unittest.mock import patch
 
@@ -7,7 +14,23 @@ import httpx
 import respx
 
 from driftballoon import DriftBalloon
-from driftballoon.client import QueuedLog, PromptConfig, LogTask
+from driftballoon._encoding import dumps
+from driftballoon.client import QueuedLog, PromptConfig, LogTask, _compile_merger, _http_client_options, _push_retries, _schedule_retry
+
+
+def _fresh(text: str) -> str:
+    """A new str object equal to ``text``, so identity checks see real interning."""
+    return text.encode().decode()
+
+
+def _retries(db) -> list[QueuedLog]:
+    """Logs waiting in the client's retry heap, earliest attempt first."""
+    return [item for *_, item in sorted(db._retry_queue)]
+
+
+def _defer(db, item: QueuedLog) -> None:
+    """Put a log straight into the client's retry heap."""
+    _push_retries(db._retry_queue, [item], db._retry_seq, db._log_queue.maxlen)
 
 
 class TestDriftBalloonInit:
@@ -46,6 +69,76 @@ class TestDriftBalloonInit:
         assert db._running is False
         assert db._sync_thread is None
 
+    def test_auto_start_disabled_uses_noop_locks_until_start(self):
+        """Test that single-threaded clients skip locking until start()."""
+        with patch.object(DriftBalloon, "_background_worker"):
+            db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+            assert isinstance(db._queue_lock, contextlib.nullcontext)
+            assert isinstance(db._config_lock, contextlib.nullcontext)
+
+            db.start()
+
+        assert not isinstance(db._queue_lock, contextlib.nullcontext)
+        assert not isinstance(db._config_lock, contextlib.nullcontext)
+        db.stop()
+
+
+class TestHttpClient:
+    """Tests for the pooled HTTP client."""
+
+    def test_http_client_is_reused(self):
+        """Test that the HTTP client is created once and reused."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        client = db.http_client
+        assert db.http_client is client
+        assert client.headers["X-API-Key"] == "db_sk_test1234567890ab"
+        assert client.timeout.connect == 3.0
+
+    def test_keepalive_outlives_sync_interval(self):
+        """Test that idle connections are kept for at least two sync cycles."""
+        assert _http_client_options("db_sk_x", 30.0)["limits"].keepalive_expiry == 60.0
+        assert _http_client_options("db_sk_x", 120.0)["limits"].keepalive_expiry == 240.0
+
+    def test_stop_closes_http_client(self):
+        """Test that stop() closes and releases the HTTP client."""
+        with patch.object(DriftBalloon, "_sync_config"):
+            db = DriftBalloon(api_key="db_sk_test1234567890ab")
+            client = db.http_client
+
+            db.stop()
+
+        assert client.is_closed
+        assert db._http_client is None
+
+    def test_stop_closes_http_client_when_never_started(self):
+        """Test that stop() releases the pool on a client that only used invoke()."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        client = db.http_client
+
+        db.stop()
+
+        assert client.is_closed
+
+    def test_concurrent_first_access_creates_one_client(self):
+        """Test that threads racing on first access share a single HTTP client."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        start = threading.Barrier(8)
+        clients = []
+
+        def grab():
+            start.wait()
+            clients.append(db.http_client)
+
+        threads = [threading.Thread(target=grab) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len({id(c) for c in clients}) == 1
+        db.stop()
+
 
 class TestLog:
     """Tests for log submission."""
@@ -59,6 +152,11 @@ class TestLog:
         assert isinstance(task, LogTask)
         assert len(db._log_queue) == 0  # Not queued until .submit()
 
+    def test_log_task_has_no_instance_dict(self):
+        """Test that LogTask instances are slotted."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        assert not hasattr(db.log(name="test", response="r", prompt="p", model="m"), "__dict__")
+
     def test_submit_queues_entry(self):
         """Test that .submit() adds entry to queue."""
         db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
@@ -71,6 +169,50 @@ class TestLog:
         assert db._log_queue[0].data["input_text"] == "Test input"
         assert db._log_queue[0].data["model"] == "gpt-4"
 
+    def test_log_submit_queues_same_payload_as_builder(self):
+        """Test that log_submit() queues exactly what log().submit() does."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db.log_submit(name="test-prompt", response="R", prompt="P", model="gpt-4")
+        db.log(name="test-prompt", response="R", prompt="P", model="gpt-4").submit()
+
+        assert db._log_queue[0].data == db._log_queue[1].data
+
+    def test_log_interns_repeated_strings(self):
+        """Test that repeated names, models and short prompts share one object."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        long_prompt = "x" * 5000
+
+        first = db.log(name=_fresh("test-prompt"), response="R1", prompt=_fresh("Input"), model=_fresh("gpt-4"))
+        second = db.log(name=_fresh("test-prompt"), response="R2", prompt=_fresh("Input"), model=_fresh("gpt-4"))
+        third = db.log(name="test-prompt", response="R3", prompt=_fresh(long_prompt), model="gpt-4")
+
+        assert _fresh("test-prompt") is not _fresh("test-prompt")
+
+        assert first._data["prompt_name"] is second._data["prompt_name"]
+        assert first._data["input_text"] is second._data["input_text"]
+        assert first._data["model"] is second._data["model"]
+        assert third._data["input_text"] == long_prompt
+
+    @pytest.mark.skipif(sys.version_info < (3, 11), reason="StrEnum requires Python 3.11+")
+    def test_log_accepts_non_str_values(self):
+        """Test that str subclasses and message-list prompts are queued unchanged."""
+        from enum import StrEnum
+
+        class Prompt(StrEnum):
+            SUMMARIZER = "summarizer"
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        messages = [{"role": "user", "content": "Input"}]
+
+        db.log(name=Prompt.SUMMARIZER, response="R1", prompt=messages, model="gpt-4").submit()
+        db.log_submit(name=Prompt.SUMMARIZER, response="R2", prompt="Input", model=Prompt.SUMMARIZER)
+        db.log_many([{"name": Prompt.SUMMARIZER, "response": "R3", "prompt": messages, "model": "gpt-4"}])
+
+        assert [e.data["prompt_name"] for e in db._log_queue] == ["summarizer"] * 3
+        assert db._log_queue[0].data["input_text"] == messages
+        assert db._log_queue[1].data["model"] is Prompt.SUMMARIZER
+
     def test_submit_multiple_entries(self):
         """Test submitting multiple entries."""
         db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
@@ -81,6 +223,101 @@ class TestLog:
 
         assert len(db._log_queue) == 3
 
+    def test_concurrent_submit_during_flush_loses_nothing(self):
+        """Test that logs submitted from many threads while flushing are all sent."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._queue_lock = threading.Lock()
+        sent = []
+        done = threading.Event()
+
+        def flusher():
+            while not done.is_set() or db._log_queue:
+                db._flush_logs()
+
+        def producer(n):
+            for i in range(500):
+                db.log(name="test", response=f"{n}-{i}", prompt="p", model="m").submit()
+
+        with patch.object(db, "_post_batch", side_effect=lambda batch: sent.extend(batch) or (len(batch), [])):
+            consumer = threading.Thread(target=flusher)
+            consumer.start()
+            producers = [threading.Thread(target=producer, args=(n,)) for n in range(4)]
+            for t in producers:
+                t.start()
+            for t in producers:
+                t.join()
+            done.set()
+            consumer.join()
+
+        assert len(sent) == 2000
+        assert len({item.data["response_text"] for item in sent}) == 2000
+
+    def test_submit_drops_oldest_when_queue_full(self):
+        """Test that a full queue discards its oldest entries."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, max_queue_size=2)
+
+        for i in range(3):
+            db.log(name="test-prompt", response=f"Response {i}", prompt="Input", model="gpt-4").submit()
+
+        assert [e.data["response_text"] for e in db._log_queue] == ["Response 1", "Response 2"]
+        assert db.queue_overflow_count == 1
+
+    def test_requeue_into_full_retry_heap_counts_overflow(self):
+        """Test that retries beyond max_queue_size count as dropped."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, max_queue_size=2)
+        db._log_queue.extend([QueuedLog(data={"n": 1}), QueuedLog(data={"n": 2})])
+        db._flushes_in_flight = 1
+
+        db._requeue([QueuedLog(data={"n": 3}), QueuedLog(data={"n": 4}), QueuedLog(data={"n": 5})])
+
+        assert [e.data["n"] for e in db._log_queue] == [1, 2]
+        assert [e.data["n"] for e in _retries(db)] == [3, 4]
+        assert db.queue_overflow_count == 1
+
+    def test_submit_wakes_worker_at_threshold(self):
+        """Test that a full batch of submits wakes the background worker."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        for i in range(DriftBalloon.FLUSH_THRESHOLD - 1):
+            db.log(name="test-prompt", response=f"Response {i}", prompt="Input", model="gpt-4").submit()
+        assert not db._wake.is_set()
+
+        db.log(name="test-prompt", response="Last", prompt="Input", model="gpt-4").submit()
+        assert db._wake.is_set()
+
+    def test_logs_in_backoff_do_not_wake_worker(self):
+        """Test that only due logs count toward the early-flush threshold."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        for i in range(DriftBalloon.FLUSH_THRESHOLD * 2):
+            _defer(db, QueuedLog(data={"n": i}, next_attempt_at=time.monotonic_ns() + 60 * 10**9))
+
+        db.log(name="test-prompt", response="Fresh", prompt="Input", model="gpt-4").submit()
+
+        assert not db._wake.is_set()
+
+    def test_log_many_queues_all_entries(self):
+        """Test that log_many() queues every entry in order."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db.log_many([
+            {"name": "prompt1", "response": f"Response {i}", "prompt": f"Input {i}", "model": "gpt-4"}
+            for i in range(3)
+        ])
+
+        assert [e.data["response_text"] for e in db._log_queue] == ["Response 0", "Response 1", "Response 2"]
+        assert db._log_queue[0].data["prompt_name"] == "prompt1"
+        assert db._log_queue[0].data["input_text"] == "Input 0"
+
+    def test_log_many_wakes_worker_at_threshold(self):
+        """Test that a large log_many() burst wakes the background worker."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db.log_many([
+            {"name": "prompt1", "response": "Response", "prompt": "Input", "model": "gpt-4"}
+        ] * DriftBalloon.FLUSH_THRESHOLD)
+
+        assert db._wake.is_set()
+
     @respx.mock
     def test_invoke_sends_synchronously(self, respx_mock):
         """Test that .invoke() sends the log synchronously."""
@@ -94,6 +331,35 @@ class TestLog:
         assert route.called
         assert len(db._log_queue) == 0  # Not queued — sent directly
 
+    @respx.mock
+    def test_invoke_sends_plain_json_by_default(self, respx_mock):
+        """Test that log bodies are not compressed unless compress_logs is set."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted", "count": 1})
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db.log(name="test-prompt", response="Long response " * 200, prompt="Input", model="gpt-4").invoke()
+
+        request = route.calls.last.request
+        assert "Content-Encoding" not in request.headers
+        assert json.loads(request.content)["logs"][0]["prompt_name"] == "test-prompt"
+
+    @respx.mock
+    def test_invoke_gzips_large_payload(self, respx_mock):
+        """Test that large log bodies are sent gzip-compressed."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted", "count": 1})
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, compress_logs=True)
+        db.log(name="test-prompt", response="Long response " * 200, prompt="Input", model="gpt-4").invoke()
+
+        request = route.calls.last.request
+        assert request.headers["Content-Encoding"] == "gzip"
+        assert request.headers["X-API-Key"] == "db_sk_test1234567890ab"
+        assert json.loads(gzip.decompress(request.content))["logs"][0]["prompt_name"] == "test-prompt"
+
 
 class TestGetActivePrompt:
     """Tests for get_active_prompt."""
@@ -127,6 +393,24 @@ class TestGetActivePrompt:
         result = db.get_active_prompt("unknown")
         assert result is None
 
+    @respx.mock
+    def test_get_active_prompt_memo_resets_on_sync(self, respx_mock):
+        """Test that memoized results are served until the next config sync."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {"test": {"active_prompt": "b"}}})
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._config_cache["test"] = PromptConfig(name="test", active_prompt="a")
+
+        assert db.get_active_prompt("test") == "a"
+        assert db._active_prompt_cache == {"test": "a"}
+
+        db._sync_config()
+
+        assert db._active_prompt_cache == {}
+        assert db.get_active_prompt("test") == "b"
+
 
 class TestGetBaselineStatus:
     """Tests for get_baseline_status."""
@@ -234,6 +518,105 @@ class TestConfigSync:
         assert config.active_prompt == "a"
         assert config.baseline_sample_count == 10
 
+    @respx.mock
+    def test_sync_config_partial_update_keeps_other_fields(self, respx_mock):
+        """Test that missing or null fields leave cached values untouched."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={
+                "prompts": {"test-prompt": {"active_prompt": "b", "drift_threshold": None}},
+            })
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._config_cache["test-prompt"] = PromptConfig(
+            name="test-prompt",
+            baseline_status="ready",
+            drift_threshold=0.9,
+        )
+
+        db._sync_config()
+
+        config = db._config_cache["test-prompt"]
+        assert config.active_prompt == "b"
+        assert config.baseline_status == "ready"
+        assert config.drift_threshold == 0.9
+
+    @respx.mock
+    def test_sync_config_new_prompt_null_fields_take_defaults(self, respx_mock):
+        """Test that null fields on a new prompt fall back to the defaults."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={
+                "prompts": {"new-prompt": {"active_prompt": None, "drift_threshold": None, "status": "paused"}},
+            })
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db._sync_config()
+
+        config = db._config_cache["new-prompt"]
+        assert config.active_prompt == "a"
+        assert config.drift_threshold == 0.7
+        assert config.status == "paused"
+
+    @respx.mock
+    def test_sync_config_publishes_new_snapshot(self, respx_mock):
+        """Test that _sync_config swaps in a new cache dict instead of mutating it."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {"new-prompt": {"active_prompt": "b"}}})
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        snapshot = db._config_cache
+
+        db._sync_config()
+
+        assert db._config_cache is not snapshot
+        assert "new-prompt" not in snapshot
+        assert db.get_active_prompt("new-prompt") == "b"
+
+    @respx.mock
+    def test_sync_config_streams_unsized_body(self, respx_mock):
+        """Test that a chunked config response is parsed incrementally."""
+        pytest.importorskip("ijson")
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, content=iter([
+                b'{"prompts": {"streamed": {"active_prompt": "b", "drift',
+                b'_threshold": 0.8}}, "cache_ttl_seconds": 30}',
+            ]))
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db._sync_config()
+
+        config = db.get_config("streamed")
+        assert config.active_prompt == "b"
+        assert config.drift_threshold == 0.8
+
+    @respx.mock
+    def test_sync_config_failed_stream_leaves_cached_prompts_untouched(self, respx_mock):
+        """Test that a streamed sync cut off mid-body changes no published config."""
+        pytest.importorskip("ijson")
+
+        def body():
+            yield b'{"prompts": {"p": {"active_prompt": "b"}, "q": {"active_'
+            raise httpx.ReadError("connection reset")
+
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, content=body())
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._config_cache = {"p": PromptConfig(name="p", active_prompt="a")}
+        assert db.get_active_prompt("p") == "a"
+
+        db._sync_config()
+
+        assert db.get_config("p").active_prompt == "a"
+        assert db.get_active_prompt("p") == "a"
+        assert db.config_version == 0
+
     @respx.mock
     def test_sync_config_handles_server_error(self, respx_mock):
         """Test that _sync_config handles server errors gracefully."""
@@ -253,6 +636,73 @@ class TestConfigSync:
         config = db._config_cache["test-prompt"]
         assert config.active_prompt == "a"  # Unchanged
 
+    @respx.mock
+    def test_sync_config_sends_etag_and_keeps_cache_on_304(self, respx_mock):
+        """Test that a repeat sync is conditional and a 304 leaves the cache alone."""
+        route = respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(side_effect=[
+            httpx.Response(200, json={"prompts": {"test-prompt": {"active_prompt": "b"}}}, headers={"ETag": '"v1"'}),
+            httpx.Response(304),
+        ])
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db._sync_config()
+        db._sync_config()
+
+        assert "if-none-match" not in route.calls[0].request.headers
+        assert route.calls[1].request.headers["if-none-match"] == '"v1"'
+        assert db.get_active_prompt("test-prompt") == "b"
+        assert db.config_version == 1
+
+    @respx.mock
+    def test_sync_and_get_returns_fresh_config_and_status(self, respx_mock):
+        """Test that sync_and_get() syncs first and reads from the new cache."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {
+                "test-prompt": {"baseline_status": "ready", "baseline_sample_count": 42},
+            }})
+        )
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        config, status = db.sync_and_get("test-prompt")
+
+        assert config.name == "test-prompt"
+        assert status == ("ready", 42)
+        assert db.sync_and_get("missing") == (None, ("learning", 0))
+
+    @respx.mock
+    def test_sync_config_bumps_version(self, respx_mock):
+        """Test that each published sync increments config_version."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        db._sync_config()
+        db._sync_config()
+
+        assert db.config_version == 2
+
+    @respx.mock
+    def test_config_max_age_refreshes_stale_cache_on_read(self, respx_mock):
+        """Test that a read past config_max_age syncs inline, once per age window."""
+        route = respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {"test-prompt": {"active_prompt": "b"}}})
+        )
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, config_max_age=60.0)
+
+        assert db.get_active_prompt("test-prompt") == "b"
+        assert db.get_config("test-prompt") is not None
+        assert route.call_count == 1
+
+    @respx.mock
+    def test_config_max_age_unset_never_syncs_on_read(self, respx_mock):
+        """Test that reads stay local when config_max_age is not set."""
+        route = respx_mock.get("https://server.driftballoon.com/api/v1/config")
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        assert db.get_active_prompt("test-prompt") is None
+        assert not route.called
+
 
 class TestFlushLogs:
     """Tests for log flushing."""
@@ -269,15 +719,52 @@ class TestFlushLogs:
         )
 
         db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
-        db._log_queue = [
+        db._log_queue.extend([
             QueuedLog(data={"prompt_name": "test", "response_text": "Response 1"}),
             QueuedLog(data={"prompt_name": "test", "response_text": "Response 2"}),
-        ]
+        ])
 
         db._flush_logs()
 
         assert len(db._log_queue) == 0
 
+    @respx.mock
+    def test_flush_logs_sends_cycle_in_one_request(self, respx_mock):
+        """Test that a full flush cycle goes out as a single POST."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted"})
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, compress_logs=False)
+        db._log_queue.extend([QueuedLog(data={"response_text": f"Response {i}"}) for i in range(DriftBalloon.MAX_BATCH_SIZE)])
+
+        db._flush_logs()
+
+        assert route.call_count == 1
+        assert len(json.loads(route.calls.last.request.content)["logs"]) == DriftBalloon.MAX_BATCH_SIZE
+        assert len(db._log_queue) == 0
+
+    @respx.mock
+    def test_flush_logs_posts_batches_in_parallel(self, respx_mock):
+        """Test that multiple batches are all posted and only failures requeue."""
+        def respond(request):
+            if b"Response 0" in request.content:
+                return httpx.Response(429, json={"error": "Rate limited"})
+            return httpx.Response(202, json={"status": "accepted"})
+
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(side_effect=respond)
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db.BATCH_POST_SIZE = 10
+        db._log_queue.extend([QueuedLog(data={"response_text": f"Response {i}"}) for i in range(25)])
+
+        db._flush_logs()
+
+        assert route.call_count == 3
+        assert [e.data["response_text"] for e in _retries(db)] == [f"Response {i}" for i in range(10)]
+        db.stop()
+        assert db._flush_pool is None
+
     @respx.mock
     def test_flush_logs_requeues_on_rate_limit(self, respx_mock):
         """Test that _flush_logs requeues on 429."""
@@ -286,15 +773,91 @@ class TestFlushLogs:
         )
 
         db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
-        db._log_queue = [
+        db._log_queue.extend([
             QueuedLog(data={"prompt_name": "test", "response_text": "Response 1"}),
-        ]
+        ])
 
         db._flush_logs()
 
         # Should be requeued
+        assert len(db._retry_queue) == 1
+
+    @respx.mock
+    def test_flush_logs_survives_invalid_key(self, respx_mock):
+        """Test that a 401 from the server neither raises nor drops the log."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(401, json={"detail": "Invalid API key"})
+        )
+        db = DriftBalloon(api_key="db_sk_invalid_key_for_testing", auto_start=False)
+        db.log(name="test", response="should not crash", prompt="p", model="m").submit()
+
+        db._flush_logs()
+
+        assert route.calls.last.request.headers["X-API-Key"] == "db_sk_invalid_key_for_testing"
+        assert _retries(db)[0].retry_count == 1
+
+    def test_flush_skipped_when_all_slots_busy(self):
+        """Test that a periodic flush gives up when MAX_CONCURRENT_FLUSHES are running."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.append(QueuedLog(data={"prompt_name": "test"}))
+        for _ in range(db.MAX_CONCURRENT_FLUSHES):
+            db._flush_slots.acquire()
+
+        with patch.object(db, "_post_batch") as post:
+            assert db._flush_logs() == 0
+
+        post.assert_not_called()
         assert len(db._log_queue) == 1
 
+    def test_final_flush_waits_for_a_slot(self):
+        """Test that the stop() flush waits for a slot instead of dropping logs."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.append(QueuedLog(data={"prompt_name": "test"}))
+        for _ in range(db.MAX_CONCURRENT_FLUSHES):
+            db._flush_slots.acquire()
+        threading.Timer(0.2, db._flush_slots.release).start()
+
+        with patch.object(db, "_post_batch", return_value=(1, [])):
+            assert db._flush_logs(ignore_backoff=True) == 1
+
+    @respx.mock
+    def test_flush_logs_sends_due_retries_ahead_of_fresh_logs(self, respx_mock):
+        """Test that failed logs wait apart and go out first once due."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(side_effect=[
+            httpx.Response(429, json={"error": "Rate limited"}),
+            httpx.Response(202, json={"status": "accepted"}),
+        ])
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.extend([QueuedLog(data={"response_text": f"Response {i}"}) for i in range(60)])
+
+        db._flush_logs()
+
+        assert len(db._retry_queue) == db.MAX_BATCH_SIZE
+        assert [e.data["response_text"] for e in db._log_queue] == [f"Response {i}" for i in range(50, 60)]
+
+        db._flush_logs(ignore_backoff=True)
+
+        sent = [e["response_text"] for e in json.loads(route.calls.last.request.content)["logs"]]
+        assert sent == [f"Response {i}" for i in range(50)]
+
+    @respx.mock
+    def test_flush_logs_keeps_logs_submitted_during_flush(self, respx_mock):
+        """Test that logs submitted mid-flush stay queued behind the remainder."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+
+        def submit_during_post(request):
+            db.log(name="late", response="Late", prompt="Input", model="gpt-4").submit()
+            return httpx.Response(202, json={"status": "accepted"})
+
+        respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(side_effect=submit_during_post)
+        db._log_queue.extend([QueuedLog(data={"response_text": f"Response {i}"}) for i in range(51)])
+
+        db._flush_logs()
+
+        assert db._log_queue[0].data["response_text"] == "Response 50"
+        assert all(e.data["prompt_name"] == "late" for e in list(db._log_queue)[1:])
+
     @respx.mock
     def test_flush_logs_retries_and_drops(self, respx_mock):
         """Test that _flush_logs retries up to max_retries then drops."""
@@ -303,9 +866,9 @@ class TestFlushLogs:
         )
 
         db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
-        db._log_queue = [
+        db._log_queue.extend([
             QueuedLog(data={"prompt_name": "test", "response_text": "Response 1"}, retry_count=4, max_retries=5),
-        ]
+        ])
 
         db._flush_logs()
 
@@ -313,6 +876,132 @@ class TestFlushLogs:
         assert len(db._log_queue) == 0
 
 
+class TestRetryBackoff:
+    """Tests for exponential retry backoff."""
+
+    @respx.mock
+    def test_failed_batch_is_scheduled_later(self, respx_mock):
+        """Test that a failed log gets a future next_attempt_at."""
+        respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(500)
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.append(QueuedLog(data={"prompt_name": "test"}, retry_count=2))
+
+        before = time.monotonic_ns()
+        db._flush_logs()
+
+        item = _retries(db)[0]
+        assert item.retry_count == 3
+        assert isinstance(item.next_attempt_at, int)
+        assert before + 2 ** 3 * 10**9 <= item.next_attempt_at <= time.monotonic_ns() + (2 ** 3 + 1) * 10**9
+
+    @respx.mock
+    def test_retry_reuses_encoded_payload(self, respx_mock):
+        """Test that a retried log is serialized once and resent byte-for-byte."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(500)
+        )
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, compress_logs=False)
+        db._log_queue.append(QueuedLog(data={"prompt_name": "test"}))
+
+        with patch("driftballoon.client.dumps", side_effect=dumps) as encoder:
+            db._flush_logs()
+            db._flush_logs(ignore_backoff=True)
+
+        assert encoder.call_count == 1
+        assert route.calls[0].request.content == route.calls[1].request.content
+        assert json.loads(route.calls[1].request.content) == {"logs": [{"prompt_name": "test"}]}
+
+    @respx.mock
+    def test_unencodable_log_is_dropped_alone(self, respx_mock):
+        """Test that a log that cannot be serialized does not sink its batch."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted"})
+        )
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        for i in range(5):
+            db.log(name="test-prompt", response=f"Response {i}", prompt="Input", model="gpt-4").submit()
+        db.log(name="test-prompt", response=object(), prompt="Input", model="gpt-4").submit()
+
+        db.stop()
+
+        assert route.call_count == 1
+        assert len(json.loads(route.calls.last.request.content)["logs"]) == 5
+        assert len(db._log_queue) == 0
+
+    @respx.mock
+    def test_failed_flush_records_earliest_retry(self, respx_mock):
+        """Test that the worker learns when the first requeued log is due again."""
+        respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(500)
+        )
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        db._log_queue.extend([QueuedLog(data={"n": 1}, retry_count=3), QueuedLog(data={"n": 2})])
+
+        db._flush_logs()
+
+        assert db._next_retry_at == min(item.next_attempt_at for item in _retries(db))
+        assert _retries(db)[0].data == {"n": 2}
+
+    @respx.mock
+    def test_flush_skips_logs_in_backoff(self, respx_mock):
+        """Test that logs still backing off stay queued and are not sent."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted"})
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        _defer(db, QueuedLog(data={"response_text": "Waiting"}, next_attempt_at=time.monotonic_ns() + 60 * 10**9))
+        _defer(db, QueuedLog(data={"response_text": "Due"}, next_attempt_at=time.monotonic_ns() - 1))
+        db._log_queue.append(QueuedLog(data={"response_text": "Ready"}))
+
+        db._flush_logs()
+
+        sent = [e["response_text"] for e in json.loads(route.calls.last.request.content)["logs"]]
+        assert sent == ["Due", "Ready"]
+        assert [e.data["response_text"] for e in _retries(db)] == ["Waiting"]
+
+    @respx.mock
+    def test_stop_flushes_logs_in_backoff(self, respx_mock):
+        """Test that the final flush on stop() ignores retry delays."""
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202, json={"status": "accepted"})
+        )
+
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        _defer(db, QueuedLog(data={"response_text": "Waiting"}, next_attempt_at=time.monotonic_ns() + 60 * 10**9))
+
+        db.stop()
+
+        assert route.called
+        assert len(db._retry_queue) == 0
+
+    @respx.mock
+    def test_outage_does_not_hammer_the_server(self, respx_mock):
+        """Test that after a failed cycle, new submits wait for the retry instead of waking the worker."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(503)
+        )
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0)
+
+        for i in range(1000):
+            db.log_submit(name="test", response=f"r{i}", prompt="p", model="m")
+            if i % 100 == 0:
+                time.sleep(0.05)
+        time.sleep(0.3)
+        posts_during_outage = route.call_count
+
+        db.stop()
+
+        assert 1 <= posts_during_outage <= 2
+        assert db._backoff_until > 0
+
+
 class TestContextManager:
     """Tests for context manager usage."""
 
@@ -325,6 +1014,187 @@ class TestContextManager:
         assert db._running is False
 
 
+class TestBackgroundWorker:
+    """Tests for the background worker lifecycle."""
+
+    def test_first_sync_runs_immediately_on_start(self):
+        """Test that start() syncs config right away, warming the connection."""
+        synced = threading.Event()
+        with patch.object(DriftBalloon, "_sync_config", side_effect=synced.set):
+            db = DriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0)
+            try:
+                assert synced.wait(timeout=2.0)
+            finally:
+                db.stop()
+
+    def test_worker_overlaps_sync_and_flush(self):
+        """Test that config sync and log flush run concurrently each cycle."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        both_running = threading.Barrier(2, timeout=2.0)
+        overlapped = []
+
+        def fake_sync():
+            both_running.wait()
+            overlapped.append("sync")
+
+        def fake_flush():
+            try:
+                both_running.wait()
+                overlapped.append("flush")
+                return 0
+            finally:
+                db._running = False
+                db._wake.set()
+
+        db._running = True
+        with patch.object(db, "_sync_config", side_effect=fake_sync), \
+                patch.object(db, "_flush_logs", side_effect=fake_flush):
+            db._background_worker()
+
+        assert sorted(overlapped) == ["flush", "sync"]
+        db._flush_pool.shutdown()
+
+    def test_backlog_flushes_back_to_back_without_extra_syncs(self):
+        """Test that a backlog is drained in consecutive cycles with one config sync."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, sync_interval=60.0)
+        db._log_queue.extend(QueuedLog(data={"n": i}) for i in range(120))
+        posted = []
+
+        def fake_post(batch):
+            posted.append(len(batch))
+            if not db._log_queue:
+                db._running = False
+                db._wake.set()
+            return len(batch), []
+
+        db._running = True
+        with patch.object(db, "_sync_config") as sync, patch.object(db, "_post_batch", side_effect=fake_post):
+            db._background_worker()
+
+        assert posted == [50, 50, 20]
+        assert sync.call_count == 1
+        db._flush_pool.shutdown()
+
+    def test_failed_cycle_is_not_followed_back_to_back(self):
+        """Test that a backlog the server rejects is not retried in a tight loop."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, sync_interval=60.0)
+        db._log_queue.extend(QueuedLog(data={"n": i}) for i in range(120))
+        posted = []
+
+        def fake_post(batch):
+            posted.append(len(batch))
+            return 0, _schedule_retry(batch)
+
+        def fake_wait(timeout):
+            db._running = False
+            return False
+
+        db._running = True
+        with patch.object(db, "_sync_config"), patch.object(db, "_post_batch", side_effect=fake_post), \
+                patch.object(db._wake, "wait", side_effect=fake_wait):
+            db._background_worker()
+
+        assert posted == [50]
+        db._flush_pool.shutdown()
+
+    def test_worker_sleeps_until_earliest_retry(self):
+        """Test that a backed-off log wakes the worker before the next config sync."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False, sync_interval=60.0)
+        timeouts = []
+
+        def fake_flush():
+            db._next_retry_at = time.monotonic_ns() + 2 * 10**9
+            return 0
+
+        def fake_wait(timeout):
+            timeouts.append(timeout)
+            db._running = False
+            return False
+
+        db._running = True
+        with patch.object(db, "_sync_config"), patch.object(db, "_flush_logs", side_effect=fake_flush), \
+                patch.object(db._wake, "wait", side_effect=fake_wait):
+            db._background_worker()
+
+        assert 0 < timeouts[0] <= 2.0
+        db._flush_pool.shutdown()
+
+    def test_stop_wakes_sleeping_worker(self):
+        """Test that stop() returns promptly instead of waiting out sync_interval."""
+        with patch.object(DriftBalloon, "_sync_config"), patch.object(DriftBalloon, "_flush_logs", return_value=0):
+            db = DriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0)
+            db.stop()
+
+        assert not db._sync_thread.is_alive()
+
+    def test_wait_drained_returns_once_queue_is_sent(self, respx_mock):
+        """Test that wait_drained() wakes the worker and returns after the flush."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(201)
+        )
+        with DriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0) as db:
+            db.log(name="test", response="r", prompt="p", model="m").submit()
+            assert db.wait_drained(timeout=2.0)
+
+        assert route.called
+
+    @respx.mock
+    def test_wait_drained_sends_remainder_below_threshold(self, respx_mock):
+        """Test that wait_drained() does not strand a partial batch until the next sync."""
+        respx_mock.get("https://server.driftballoon.com/api/v1/config").mock(
+            return_value=httpx.Response(200, json={"prompts": {}})
+        )
+        route = respx_mock.post("https://server.driftballoon.com/api/v1/logs").mock(
+            return_value=httpx.Response(202)
+        )
+        with DriftBalloon(api_key="db_sk_test1234567890ab", sync_interval=60.0) as db:
+            time.sleep(0.2)  # Let the first cycle finish so the worker is asleep
+            db._log_queue.extend(QueuedLog(data={"n": i}) for i in range(55))
+
+            assert db.wait_drained(timeout=3.0)
+            assert route.call_count == 2
+
+    def test_wait_drained_times_out_while_logs_back_off(self):
+        """Test that wait_drained() gives up when queued logs cannot be sent yet."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        _defer(db, QueuedLog(data={"prompt_name": "test"}, next_attempt_at=time.monotonic_ns() + 60 * 10**9))
+
+        assert db.wait_drained(timeout=0.05) is False
+
+    def test_wait_drained_returns_immediately_when_empty(self):
+        """Test that wait_drained() does not block on an empty queue."""
+        db = DriftBalloon(api_key="db_sk_test1234567890ab", auto_start=False)
+        assert db.wait_drained(timeout=0) is True
+
+
+class TestCompiledMerger:
+    """Tests for the generated PromptConfig merger."""
+
+    def test_merger_matches_field_list(self):
+        """Test that the generated merger takes present fields and skips null ones."""
+        merge = _compile_merger(("active_prompt", "drift_threshold"))
+        config = PromptConfig(name="test", drift_threshold=0.9, status="paused")
+
+        merged = merge("test", config, {"active_prompt": "b", "drift_threshold": None, "status": "active"})
+
+        assert merged.active_prompt == "b"
+        assert merged.drift_threshold == 0.9
+        assert merged.status == "paused"  # Not in the compiled field list
+
+    def test_merger_returns_a_new_object(self):
+        """Test that merging leaves the base config untouched."""
+        merge = _compile_merger(("active_prompt",))
+        config = PromptConfig(name="test", active_prompt="a")
+
+        merged = merge("test", config, {"active_prompt": "b"})
+
+        assert merged is not config
+        assert config.active_prompt == "a"
+
+
 class TestQueuedLog:
     """Tests for QueuedLog dataclass."""
 
@@ -336,6 +1206,11 @@ class TestQueuedLog:
         assert log.retry_count == 0
         assert log.max_retries == 5
 
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+    def test_queued_log_has_no_instance_dict(self):
+        """Test that QueuedLog instances are slotted."""
+        assert not hasattr(QueuedLog(data={}), "__dict__")
+
 
 class TestPromptConfig:
     """Tests for PromptConfig dataclass."""
@@ -353,3 +1228,8 @@ class TestPromptConfig:
         assert config.length_drift_threshold == 1.5
         assert config.auto_switch_enabled is True
         assert config.status == "active"
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+    def test_prompt_config_has_no_instance_dict(self):
+        """Test that PromptConfig instances are slotted."""
+        assert not hasattr(PromptConfig(name="test"), "__dict__")
@@ -0,0 +1,119 @@
+"""Tests for log request body encoding."""
+
+import gzip
+import json
+
+import pytest
+
+from driftballoon import _encoding
+from driftballoon._encoding import (
+    GZIP_MIN_BYTES,
+    STREAM_MIN_BYTES,
+    _stdlib_dumps,
+    dumps,
+    encode_log_batch,
+    encode_logs,
+    loads,
+    should_stream,
+)
+
+
+class TestEncodeLogs:
+    """Tests for encode_logs."""
+
+    def test_small_body_is_plain_json(self):
+        """Test that bodies under the threshold are sent uncompressed."""
+        body, headers = encode_logs([{"prompt_name": "test", "response_text": "Short"}])
+
+        assert json.loads(body) == {"logs": [{"prompt_name": "test", "response_text": "Short"}]}
+        assert headers == {"Content-Type": "application/json"}
+
+    def test_large_body_is_gzipped(self):
+        """Test that bodies over the threshold are gzipped."""
+        logs = [{"prompt_name": "test", "response_text": "x" * GZIP_MIN_BYTES}]
+
+        body, headers = encode_logs(logs, compress=True)
+
+        assert headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(body)) == {"logs": logs}
+        assert len(body) < GZIP_MIN_BYTES
+
+    def test_compression_off_by_default(self):
+        """Test that large bodies are plain JSON unless compression is requested."""
+        logs = [{"prompt_name": "test", "response_text": "x" * GZIP_MIN_BYTES}]
+
+        body, headers = encode_logs(logs)
+
+        assert "Content-Encoding" not in headers
+        assert json.loads(body) == {"logs": logs}
+
+    def test_non_ascii_is_utf8(self):
+        """Test that non-ASCII text is encoded as UTF-8, not escaped."""
+        body, _ = encode_logs([{"response_text": "Grüße 👋"}])
+
+        assert "Grüße 👋".encode() in body
+
+    def test_batch_of_encoded_entries_matches_encode_logs(self):
+        """Test that pre-serialized entries produce the same body as dict entries."""
+        logs = [{"prompt_name": "a", "response_text": "One"}, {"prompt_name": "b", "response_text": "Two"}]
+
+        body, headers = encode_log_batch([dumps(log) for log in logs])
+
+        assert json.loads(body) == json.loads(encode_logs(logs)[0])
+        assert headers == {"Content-Type": "application/json"}
+
+    def test_empty_batch_is_valid_json(self):
+        """Test that an empty entry list still encodes a well-formed body."""
+        assert json.loads(encode_log_batch([])[0]) == {"logs": []}
+
+
+class TestDumps:
+    """Tests for the JSON serializer and decoder selection."""
+
+    def test_dumps_matches_stdlib(self):
+        """Test that the selected serializer produces the same JSON as the fallback."""
+        obj = {"logs": [{"prompt_name": "test", "response_text": "Grüße", "n": 1.5}]}
+
+        assert json.loads(dumps(obj)) == json.loads(_stdlib_dumps(obj))
+        assert isinstance(dumps(obj), bytes)
+
+    def test_dumps_prefers_msgspec(self):
+        """Test that msgspec's encoder is selected when it is installed."""
+        msgspec = pytest.importorskip("msgspec")
+
+        assert isinstance(_encoding.dumps.__self__, msgspec.json.Encoder)
+
+    def test_loads_round_trips_config_payload(self):
+        """Test that the selected decoder returns plain dicts."""
+        payload = {"prompts": {"test": {"active_prompt": "b", "drift_threshold": 0.8}}}
+
+        assert loads(dumps(payload)) == payload
+
+
+class TestConfigStreaming:
+    """Tests for incremental config parsing."""
+
+    def test_parser_yields_prompts_as_they_complete(self):
+        """Test that prompts are returned once their object is complete."""
+        pytest.importorskip("ijson")
+        parser = _encoding.ConfigStreamParser()
+
+        first = parser.feed(b'{"prompts": {"a": {"drift_threshold": 0.8}, "b": {"st')
+        rest = parser.feed(b'atus": "paused"}}, "cache_ttl_seconds": 30}')
+
+        assert first == [("a", {"drift_threshold": 0.8})]
+        assert rest + parser.close() == [("b", {"status": "paused"})]
+
+    def test_should_stream_large_or_unknown_length(self):
+        """Test that only large or unsized bodies are streamed."""
+        pytest.importorskip("ijson")
+
+        assert should_stream(None) is True
+        assert should_stream(str(STREAM_MIN_BYTES)) is True
+        assert should_stream("512") is False
+
+    def test_should_stream_without_ijson(self, monkeypatch):
+        """Test that bodies are buffered when ijson is unavailable."""
+        monkeypatch.setattr(_encoding, "ijson", None)
+
+        assert should_stream(None) is False
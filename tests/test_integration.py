@@ -1,16 +1,25 @@
 """Integration tests for DriftBalloon SDK against a live local backend.
 
-Run with:  pytest -m integration -v
+Run with:  pytest -m integration -n auto -v
 Requires:  a running local backend (e.g. `make api` from the repo root)
 """
 
-import time
+import os
 
 import pytest
 
 from driftballoon import DriftBalloon
 
-pytestmark = pytest.mark.integration
+pytestmark = [pytest.mark.integration, pytest.mark.usefixtures("warmup")]
+
+# Set by pytest-xdist; each worker signs up its own test user, and prompt
+# names carry the worker id so parallel runs never share backend counters.
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+
+
+def _prompt(name: str) -> str:
+    """Namespace a prompt name to the current xdist worker."""
+    return f"{name}-{WORKER}"
 
 
 # ---------------------------------------------------------------------------
@@ -20,29 +29,21 @@ pytestmark = pytest.mark.integration
 class TestSDKLogRoundTrip:
     """Verify that logs reach the backend and the queue drains."""
 
-    def test_log_single_entry(self, test_api_key: str, backend_url: str):
-        db = DriftBalloon(
-            api_key=test_api_key,
-            base_url=backend_url,
-            auto_start=False,
-        )
-        db.log(name="integ-log-single", response="Hello from integration test").submit()
+    def test_log_single_entry(self, db: DriftBalloon):
+        db.log(name=_prompt("integ-log-single"), response="Hello from integration test", prompt="Integration input", model="gpt-4").submit()
         assert len(db._log_queue) == 1
 
-        db._flush_logs()
+        assert db._flush_logs() == 1
         assert len(db._log_queue) == 0
 
-    def test_log_batch(self, test_api_key: str, backend_url: str):
-        db = DriftBalloon(
-            api_key=test_api_key,
-            base_url=backend_url,
-            auto_start=False,
-        )
-        for i in range(5):
-            db.log(name="integ-log-batch", response=f"Batch response {i}").submit()
+    def test_log_batch(self, db: DriftBalloon):
+        db.log_many([
+            {"name": _prompt("integ-log-batch"), "response": f"Batch response {i}", "prompt": f"Batch input {i}", "model": "gpt-4"}
+            for i in range(5)
+        ])
         assert len(db._log_queue) == 5
 
-        db._flush_logs()
+        assert db._flush_logs() == 5
         assert len(db._log_queue) == 0
 
     def test_background_flush(self, test_api_key: str, backend_url: str):
@@ -54,10 +55,9 @@ class TestSDKLogRoundTrip:
         )
         try:
             for i in range(3):
-                db.log(name="integ-log-bg", response=f"BG response {i}").submit()
+                db.log(name=_prompt("integ-log-bg"), response=f"BG response {i}", prompt=f"BG input {i}", model="gpt-4").submit()
 
-            # Wait long enough for at least one background cycle
-            time.sleep(2.5)
+            assert db.wait_drained(timeout=5.0)
             assert len(db._log_queue) == 0
         finally:
             db.stop()
@@ -70,43 +70,25 @@ class TestSDKLogRoundTrip:
 class TestSDKConfigSync:
     """Verify config sync pulls real data from the backend."""
 
-    def test_sync_config(self, test_api_key: str, backend_url: str):
-        db = DriftBalloon(
-            api_key=test_api_key,
-            base_url=backend_url,
-            auto_start=False,
-        )
+    def test_sync_config(self, db: DriftBalloon):
         # Log once so the prompt exists server-side
-        db.log(name="integ-config-sync", response="seed log").invoke()
+        db.log(name=_prompt("integ-config-sync"), response="seed log", prompt="seed input", model="gpt-4").invoke()
 
-        db._sync_config()
-
-        config = db.get_config("integ-config-sync")
+        config, _ = db.sync_and_get(_prompt("integ-config-sync"))
         assert config is not None
-        assert config.name == "integ-config-sync"
+        assert config.name == _prompt("integ-config-sync")
 
-    def test_get_active_prompt(self, test_api_key: str, backend_url: str):
-        db = DriftBalloon(
-            api_key=test_api_key,
-            base_url=backend_url,
-            auto_start=False,
-        )
-        db.log(name="integ-active-prompt", response="seed log").invoke()
-        db._sync_config()
+    def test_get_active_prompt(self, db: DriftBalloon):
+        db.log(name=_prompt("integ-active-prompt"), response="seed log", prompt="seed input", model="gpt-4").invoke()
 
-        active = db.get_active_prompt("integ-active-prompt")
-        assert active == "a"
+        config, _ = db.sync_and_get(_prompt("integ-active-prompt"))
+        assert config.active_prompt == "a"
+        assert db.get_active_prompt(_prompt("integ-active-prompt")) == "a"
 
-    def test_get_baseline_status(self, test_api_key: str, backend_url: str):
-        db = DriftBalloon(
-            api_key=test_api_key,
-            base_url=backend_url,
-            auto_start=False,
-        )
-        db.log(name="integ-baseline", response="seed log").invoke()
-        db._sync_config()
+    def test_get_baseline_status(self, db: DriftBalloon):
+        db.log(name=_prompt("integ-baseline"), response="seed log", prompt="seed input", model="gpt-4").invoke()
 
-        status, count = db.get_baseline_status("integ-baseline")
+        _, (status, count) = db.sync_and_get(_prompt("integ-baseline"))
         assert status == "learning"
         assert count < 30
 
@@ -125,27 +107,9 @@ class TestSDKContextManager:
             sync_interval=1.0,
             auto_start=True,
         ) as db:
-            db.log(name="integ-lifecycle", response="lifecycle test").submit()
-            time.sleep(2.0)
+            db.log(name=_prompt("integ-lifecycle"), response="lifecycle test", prompt="lifecycle input", model="gpt-4").submit()
+            assert db.wait_drained(timeout=5.0)
             assert len(db._log_queue) == 0
 
         # After exiting, background thread should be stopped
         assert db._running is False
-
-
-# ---------------------------------------------------------------------------
-# Error handling
-# ---------------------------------------------------------------------------
-
-class TestSDKErrorHandling:
-    """Verify graceful degradation with bad credentials."""
-
-    def test_invalid_key_graceful(self, backend_url: str):
-        db = DriftBalloon(
-            api_key="db_sk_invalid_key_for_testing",
-            base_url=backend_url,
-            auto_start=False,
-        )
-        db.log(name="integ-bad-key", response="should not crash").submit()
-        # Flush should not raise even with an invalid key
-        db._flush_logs()